@@ -1,13 +1,20 @@
 import os
 import uuid
 import json
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, send_file
+import time
+import logging
+import threading
+from flask import Flask, render_template, request, redirect, url_for, jsonify, send_file, Response, stream_with_context
 from werkzeug.utils import secure_filename
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from text_summariser import (
-    summarize_text, preprocess_text, extract_keywords, extract_entities,
+    summarize_text_stream, extract_keywords, extract_entities,
     analyze_sentiment, classify_topic, readability_score, read_pdf,
     extract_text_from_image, transcribe_audio, summarize_video, answer_question,
-    save_as_txt, save_as_json, save_as_pdf, save_as_docx
+    save_as_txt, save_as_json, save_as_pdf, save_as_docx, get_summarizer,
+    get_qa_model, get_wav2vec2, get_zero_shot_classifier, get_whisper_model,
+    get_caption_model, get_embedding_model, loaded_models, models, get_summary_cache, load_plans,
+    DocumentAnalysis, backend_failures
 )
 from langdetect import detect
 from deep_translator import GoogleTranslator
@@ -29,10 +36,264 @@ if not os.path.exists(RESULTS_FOLDER):
 # Store session data
 session_data = {}
 
+# Share generate calls between concurrent requests through the per-model batch scheduler
+app.config['MICRO_BATCHING'] = os.environ.get('MICRO_BATCHING', '1') == '1'
+
+# Latency budget for summarization in milliseconds (0 for none); requests may pass their own deadline_ms
+app.config['SUMMARIZE_DEADLINE_MS'] = int(os.environ.get('SUMMARIZE_DEADLINE_MS', '0'))
+
+# Threads running the analyses shown next to the summary, shared by all requests
+app.config['ANALYSIS_WORKERS'] = int(os.environ.get('ANALYSIS_WORKERS', '4'))
+# Start the analyses before summarizing so they run while the summary is generated
+app.config['OVERLAP_ANALYSES'] = os.environ.get('OVERLAP_ANALYSES', '1') == '1'
+
+# Models loaded in the background at startup, comma separated (empty to disable)
+app.config['PRELOAD_MODELS'] = [
+    name.strip() for name in os.environ.get('PRELOAD_MODELS', 'bart-large,roberta-qa,wav2vec2').split(',')
+    if name.strip()
+]
+
+# Names accepted in PRELOAD_MODELS: every summarization model choice plus the auxiliary models
+PRELOADERS = {choice: (lambda choice=choice: get_summarizer(choice)) for choice, model_name in models.items() if model_name}
+PRELOADERS.update({
+    "roberta-qa": get_qa_model,
+    "wav2vec2": get_wav2vec2,
+    "zero-shot": get_zero_shot_classifier,
+    "embedding": get_embedding_model,
+    "whisper": get_whisper_model,
+    "captioning": get_caption_model
+})
+
+preload_status = {"started": False, "pending": [], "loaded": {}, "failed": {}}
+preload_lock = threading.Lock()
+
+def preload_models():
+    """Load the configured models one after another, recording how long each took"""
+    for name in list(preload_status["pending"]):
+        start = time.time()
+        try:
+            loader = PRELOADERS.get(name)
+            if loader is None:
+                raise ValueError(f"Unknown model '{name}'")
+            loader()
+            with preload_lock:
+                preload_status["loaded"][name] = round(time.time() - start, 2)
+        except Exception as e:
+            logging.error(f"Preloading {name} failed: {e}")
+            with preload_lock:
+                preload_status["failed"][name] = str(e)
+        finally:
+            with preload_lock:
+                preload_status["pending"].remove(name)
+
+def start_preloading():
+    """Start warming up the configured models in a background thread (once per process)"""
+    if preload_status["started"]:
+        return
+    with preload_lock:
+        if preload_status["started"]:
+            return
+        preload_status["started"] = True
+        preload_status["pending"] = list(app.config['PRELOAD_MODELS'])
+    threading.Thread(target=preload_models, name="model-preload", daemon=True).start()
+
+@app.before_request
+def preload_on_first_request():
+    # Under a WSGI server the first request, usually a /readyz probe, starts the warm-up,
+    # so merely importing the app loads no models
+    start_preloading()
+
+# Modified summarize_text function to accept max_words parameter instead of prompting
+def iter_summary_with_max_words(text, model_choice, max_words, batch_size=None, deadline_ms=None, latency_tier="standard"):
+    """Yield chunk summaries in document order as they are produced, then the final summary"""
+    # Greedy decoding with every chunk summary allowed up to max_words, joined as the model wrote them;
+    # cached and planned like the CLI
+    return summarize_text_stream(
+        text, model_choice, max_words, batch_size=batch_size, deadline_ms=deadline_ms, latency_tier=latency_tier,
+        params={"do_sample": False}, chunk_lengths=(max_words, 10), micro_batching=app.config['MICRO_BATCHING'],
+        polish=False
+    )
+
+def summarize_with_max_words(text, model_choice, max_words, batch_size=None, deadline_ms=None, latency_tier="standard"):
+    """Return (summary, degraded, model_choice) for a text, with "auto" replaced by the routed model"""
+    final_summary, degraded = "", False
+    for event in iter_summary_with_max_words(text, model_choice, max_words, batch_size, deadline_ms, latency_tier):
+        if event["event"] == "model":
+            model_choice = event["model_choice"]
+        elif event["event"] == "summary":
+            final_summary, degraded = event["summary"], event["degraded"]
+    return final_summary, degraded, model_choice
+
+def save_upload(field):
+    """Save an uploaded file into the upload folder and return its path"""
+    file = request.files[field]
+    filename = secure_filename(file.filename)
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    file.save(filepath)
+    return filepath
+
+def has_upload(field):
+    return field in request.files and request.files[field].filename
+
+def read_user_input():
+    """Extract the text to summarize from the submitted form, returning (text, input_type)"""
+    if request.form.get('text_input'):
+        return request.form.get('text_input'), "text"
+    
+    elif has_upload('file_input'):
+        with open(save_upload('file_input'), 'r', encoding='utf-8') as f:
+            return f.read(), "file"
+    
+    elif has_upload('pdf_input'):
+        return read_pdf(save_upload('pdf_input')), "pdf"
+    
+    elif has_upload('image_input'):
+        return extract_text_from_image(save_upload('image_input')), "image"
+    
+    elif has_upload('audio_input'):
+        return transcribe_audio(save_upload('audio_input')), "audio"
+    
+    elif has_upload('video_input'):
+        return summarize_video(save_upload('video_input')), "video"
+    
+    return None, None
+
+def translate_to_english(text):
+    """Detect the language and translate to English if needed"""
+    try:
+        language = detect(text)
+        if language != "en":
+            text = GoogleTranslator(source=language, target="en").translate(text)
+    except:
+        # If language detection fails, proceed with original text
+        pass
+    return text
+
+# Additional analyses shown next to the summary, in display order; each takes the request's DocumentAnalysis
+# and has a timeout in seconds, counted from when it is submitted to the analysis pool
+ANALYSES = [
+    ("keywords", lambda text: extract_keywords(text)[:10], 10),  # Limit to top 10 keywords
+    ("entities", lambda text: extract_entities(text)[:15], 20),  # Limit to top 15 entities
+    ("sentiment", analyze_sentiment, 10),
+    ("topic", classify_topic, 30),
+    ("readability", readability_score, 10)
+]
+
+analysis_pool = None
+analysis_pool_lock = threading.Lock()
+
+def get_analysis_pool():
+    """Bounded thread pool the analyses of every request run on, created on first use"""
+    global analysis_pool
+    with analysis_pool_lock:
+        if analysis_pool is None:
+            analysis_pool = ThreadPoolExecutor(max_workers=app.config['ANALYSIS_WORKERS'], thread_name_prefix="analysis")
+    return analysis_pool
+
+def start_analyses(document):
+    """Submit every analysis of a document to the analysis pool, returning one job per analysis"""
+    jobs = []
+    for name, analyze, timeout in ANALYSES:
+        job = {"name": name, "timeout": timeout, "submitted": time.monotonic(), "started": None}
+        
+        def run(job=job, analyze=analyze):
+            job["started"] = time.monotonic()
+            return analyze(document), time.monotonic() - job["started"]
+        
+        job["future"] = get_analysis_pool().submit(run)
+        jobs.append(job)
+    return jobs
+
+def iter_analyses(jobs):
+    """
+    Yield the outcome of each analysis as soon as it is known, in completion order.
+
+    :param jobs: Jobs returned by start_analyses.
+    :return: Dicts with the analysis "name", its "result" (None unless it succeeded), the
+             time it took in "ms" and its "status": "ok", "error" or "timeout". Timeouts count
+             from submission, so time spent queued for a worker counts too and the panel never
+             waits longer than the largest timeout. A timed-out analysis that has not started is
+             cancelled; one already running is left to finish in the background and its result dropped.
+    """
+    pending = {job["future"]: job for job in jobs}
+    while pending:
+        now = time.monotonic()
+        next_deadline = min(job["submitted"] + job["timeout"] for job in pending.values())
+        done, _ = wait(pending, timeout=max(0, next_deadline - now), return_when=FIRST_COMPLETED)
+        now = time.monotonic()
+        
+        for future in done:
+            job = pending.pop(future)
+            try:
+                result, seconds = future.result()
+                yield {"name": job["name"], "result": result, "ms": round(seconds * 1000), "status": "ok"}
+            except Exception as e:
+                logging.error(f"Analysis {job['name']} failed: {e}")
+                yield {"name": job["name"], "result": None, "ms": round((now - job["submitted"]) * 1000), "status": "error"}
+        
+        for future, job in list(pending.items()):
+            if now - job["submitted"] >= job["timeout"]:
+                del pending[future]
+                # Frees the worker slot of an analysis still waiting in the queue
+                future.cancel()
+                logging.warning(f"Analysis {job['name']} timed out after {job['timeout']}s")
+                yield {"name": job["name"], "result": None, "ms": round((now - job["submitted"]) * 1000), "status": "timeout"}
+
+def collect_analyses(jobs):
+    """Wait for the analyses of a request, returning their results in display order and their timings"""
+    analysis = {job["name"]: None for job in jobs}
+    timings = {}
+    for outcome in iter_analyses(jobs):
+        analysis[outcome["name"]] = outcome["result"]
+        timings[outcome["name"]] = {"ms": outcome["ms"], "status": outcome["status"]}
+    return analysis, {job["name"]: timings[job["name"]] for job in jobs}
+
+def save_results(session_id, result, model_choice, input_type):
+    """Keep the result for later retrieval and save the summary in every download format"""
+    session_data[session_id] = {
+        "result": result,
+        "model_choice": model_choice,
+        "input_type": input_type
+    }
+    
+    result_dir = os.path.join(RESULTS_FOLDER, session_id)
+    if not os.path.exists(result_dir):
+        os.makedirs(result_dir)
+    
+    summary = result["summary"]
+    save_as_txt(summary, os.path.join(result_dir, "summary.txt"))
+    save_as_json(result, os.path.join(result_dir, "summary.json"))
+    save_as_pdf(summary, os.path.join(result_dir, "summary.pdf"))
+    save_as_docx(summary, os.path.join(result_dir, "summary.docx"))
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/healthz')
+def healthz():
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz')
+def readyz():
+    # Ready once every preload has finished; models that failed are listed and load again on first use
+    with preload_lock:
+        pending = list(preload_status["pending"])
+        status = {
+            "ready": preload_status["started"] and not pending,
+            "pending": pending,
+            "preloaded": dict(preload_status["loaded"]),
+            "failed": dict(preload_status["failed"])
+        }
+    status["models"] = loaded_models()
+    status["load_plans"] = load_plans()
+    status["backend_failures"] = backend_failures()
+    return jsonify(status), 200 if status["ready"] else 503
+
+@app.route('/cache_stats')
+def cache_stats():
+    return jsonify(get_summary_cache().stats())
+
 @app.route('/summarize', methods=['POST'])
 def summarize():
     try:
@@ -44,160 +305,112 @@ def summarize():
         
         # Get max words
         max_words = int(request.form.get('max_words', 150))
+        deadline_ms = int(request.form.get('deadline_ms') or app.config['SUMMARIZE_DEADLINE_MS'])
+        latency_tier = request.form.get('latency_tier', 'standard')
         
         # Determine input type and process accordingly
-        user_input = ""
-        input_type = "text"
-        
-        if request.form.get('text_input'):
-            user_input = request.form.get('text_input')
-            input_type = "text"
-        
-        elif 'file_input' in request.files and request.files['file_input'].filename:
-            file = request.files['file_input']
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
-            
-            with open(filepath, 'r', encoding='utf-8') as f:
-                user_input = f.read()
-            input_type = "file"
-        
-        elif 'pdf_input' in request.files and request.files['pdf_input'].filename:
-            file = request.files['pdf_input']
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
-            
-            user_input = read_pdf(filepath)
-            input_type = "pdf"
-        
-        elif 'image_input' in request.files and request.files['image_input'].filename:
-            file = request.files['image_input']
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
-            
-            user_input = extract_text_from_image(filepath)
-            input_type = "image"
-        
-        elif 'audio_input' in request.files and request.files['audio_input'].filename:
-            file = request.files['audio_input']
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
-            
-            user_input = transcribe_audio(filepath)
-            input_type = "audio"
-        
-        elif 'video_input' in request.files and request.files['video_input'].filename:
-            file = request.files['video_input']
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
-            
-            user_input = summarize_video(filepath)
-            input_type = "video"
-        
-        else:
+        user_input, input_type = read_user_input()
+        if user_input is None:
             return render_template('index.html', error="Please provide some input")
         
         if not user_input.strip():
             return render_template('index.html', error="Empty input! Try again.")
         
-        # Detect language and translate if needed
-        try:
-            language = detect(user_input)
-            if language != "en":
-                user_input = GoogleTranslator(source=language, target="en").translate(user_input)
-        except:
-            # If language detection fails, proceed with original text
-            pass
+        user_input = translate_to_english(user_input)
         
-        # Process and summarize text
-        processed_text = preprocess_text(user_input)
+        # Parse once for preprocessing and all the analyses
+        document = DocumentAnalysis(user_input)
+        jobs = start_analyses(document) if app.config['OVERLAP_ANALYSES'] else None
         
-        # Modified summarize_text function to accept max_words parameter instead of prompting
-        def summarize_with_max_words(text, model_choice, max_words):
-            from transformers import pipeline
-            import torch
-            from textwrap import wrap
-            
-            # Get the model name
-            models = {
-                "t5-small": "t5-small",
-                "bart-large": "facebook/bart-large-cnn",
-                "distilbart": "sshleifer/distilbart-cnn-12-6",
-                "pegasus": "google/pegasus-xsum",
-                "t5-3b": "t5-3b"
-            }
-            
-            model_name = models.get(model_choice, "facebook/bart-large-cnn")
-            model = pipeline("summarization", model=model_name, tokenizer=model_name, framework="pt", device=0 if torch.cuda.is_available() else -1)
-            
-            # Split text into manageable chunks and summarize each chunk
-            text_chunks = wrap(text, width=500)
-            summaries = []
-            
-            for chunk in text_chunks:
-                try:
-                    summary_output = model(chunk, max_length=max_words, min_length=10, do_sample=False)
-                    summaries.append(summary_output[0]['summary_text'])
-                except Exception as e:
-                    summaries.append(chunk)  # Fallback to original chunk if summarization fails
-            
-            # Combine summaries and truncate to match the max word limit
-            final_summary = " ".join(summaries)
-            final_summary_words = final_summary.split()
-            if len(final_summary_words) > max_words:
-                final_summary = " ".join(final_summary_words[:max_words])
-            
-            return final_summary
+        # Process and summarize text
+        processed_text = document.preprocessed()
         
-        summary = summarize_with_max_words(processed_text, model_choice, max_words)
+        summary, degraded, model_choice = summarize_with_max_words(processed_text, model_choice, max_words,
+                                                                   deadline_ms=deadline_ms, latency_tier=latency_tier)
         
-        # Perform additional analysis
-        keywords = extract_keywords(user_input)[:10]  # Limit to top 10 keywords
-        entities = extract_entities(user_input)[:15]  # Limit to top 15 entities
-        sentiment = analyze_sentiment(user_input)
-        topic = classify_topic(user_input)
-        readability = readability_score(user_input)
+        # Perform additional analysis, all analyses at once
+        analysis, analysis_timings = collect_analyses(jobs or start_analyses(document))
         
         # Prepare result data
         result = {
             "summary": summary,
+            "degraded": degraded,
             "original_text": user_input,
-            "analysis": {
-                "keywords": keywords,
-                "entities": entities,
-                "sentiment": sentiment,
-                "topic": topic,
-                "readability": readability
-            }
-        }
-        
-        # Save results for later retrieval
-        session_data[session_id] = {
-            "result": result,
-            "model_choice": model_choice,
-            "input_type": input_type
+            "analysis": analysis,
+            "analysis_timings": analysis_timings
         }
         
-        # Save summary in different formats
-        result_dir = os.path.join(RESULTS_FOLDER, session_id)
-        if not os.path.exists(result_dir):
-            os.makedirs(result_dir)
-        
-        save_as_txt(summary, os.path.join(result_dir, "summary.txt"))
-        save_as_json(result, os.path.join(result_dir, "summary.json"))
-        save_as_pdf(summary, os.path.join(result_dir, "summary.pdf"))
-        save_as_docx(summary, os.path.join(result_dir, "summary.docx"))
+        # Save results for later retrieval and in different formats
+        save_results(session_id, result, model_choice, input_type)
         
         return render_template('result.html', result=result, session_id=session_id)
     
     except Exception as e:
         return render_template('index.html', error=f"An error occurred: {str(e)}")
 
+def sse(event, data):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/summarize/stream', methods=['POST'])
+def summarize_stream():
+    """Same pipeline as /summarize, pushing partial summaries and progress as Server-Sent Events"""
+    session_id = str(uuid.uuid4())
+    model_choice = request.form.get('model_choice', 'bart-large')
+    max_words = int(request.form.get('max_words', 150))
+    deadline_ms = int(request.form.get('deadline_ms') or app.config['SUMMARIZE_DEADLINE_MS'])
+    latency_tier = request.form.get('latency_tier', 'standard')
+    
+    # Uploads must be read while the request is still open
+    user_input, input_type = read_user_input()
+    if user_input is None or not user_input.strip():
+        return jsonify({"error": "Please provide some input"}), 400
+    
+    def events():
+        try:
+            yield sse("progress", {"stage": "translate"})
+            text = translate_to_english(user_input)
+            document = DocumentAnalysis(text)
+            jobs = start_analyses(document) if app.config['OVERLAP_ANALYSES'] else None
+            
+            yield sse("progress", {"stage": "preprocess"})
+            processed_text = document.preprocessed()
+            
+            yield sse("progress", {"stage": "summarize"})
+            summary, degraded, used_model = "", False, model_choice
+            for event in iter_summary_with_max_words(processed_text, model_choice, max_words, deadline_ms=deadline_ms,
+                                                     latency_tier=latency_tier):
+                if event["event"] == "model":
+                    used_model = event["model_choice"]
+                elif event["event"] == "summary":
+                    summary, degraded = event["summary"], event["degraded"]
+                yield sse(event["event"], event)
+            
+            # Analyses are reported as they finish, the slowest last
+            yield sse("progress", {"stage": "analysis"})
+            jobs = jobs or start_analyses(document)
+            analysis = {job["name"]: None for job in jobs}
+            analysis_timings = {}
+            for outcome in iter_analyses(jobs):
+                analysis[outcome["name"]] = outcome["result"]
+                analysis_timings[outcome["name"]] = {"ms": outcome["ms"], "status": outcome["status"]}
+                yield sse("analysis", outcome)
+            
+            yield sse("progress", {"stage": "save"})
+            result = {"summary": summary, "degraded": degraded, "original_text": text, "analysis": analysis,
+                      "analysis_timings": analysis_timings}
+            save_results(session_id, result, used_model, input_type)
+            
+            yield sse("done", {"session_id": session_id, "summary": summary})
+        except Exception as e:
+            yield sse("error", {"error": str(e)})
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/download/<session_id>/<format>')
 def download(session_id, format):
     if session_id not in session_data:
@@ -231,4 +444,7 @@ def ask_question(session_id):
     return jsonify({"answer": answer})
 
 if __name__ == '__main__':
+    # With the debug reloader only the child process that serves requests preloads
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_preloading()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
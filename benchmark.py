@@ -0,0 +1,392 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+import statistics
+import time
+
+# Heavy libraries whose presence after `import text_summariser` means they were loaded eagerly
+HEAVY_MODULES = [
+    "nltk", "torch", "transformers", "spacy", "whisper", "easyocr", "cv2", "librosa", "pydub",
+    "speech_recognition", "openai", "PyPDF2", "pytesseract", "fpdf", "docx", "textblob",
+    "rake_nltk", "textstat", "langdetect", "deep_translator"
+]
+
+IMPORT_PROBE = """
+import sys, time, json, resource
+sys.path.insert(0, {path!r})
+start = time.perf_counter()
+import text_summariser
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{
+    "seconds": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_modules": heavy
+}}))
+"""
+
+def measure_import(module_dir, repeat):
+    """Import text_summariser from module_dir in fresh interpreters and collect timings"""
+    runs = []
+    for _ in range(repeat):
+        probe = IMPORT_PROBE.format(path=module_dir, heavy=HEAVY_MODULES)
+        # Run from a scratch directory so the module's log file does not land in the repo
+        with tempfile.TemporaryDirectory() as scratch:
+            process = subprocess.run(
+                [sys.executable, "-c", probe], cwd=scratch,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            )
+        if process.returncode != 0:
+            error = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "unknown error"
+            sys.exit(f"Could not import text_summariser from {module_dir}: {error}")
+        runs.append(json.loads(process.stdout.strip().splitlines()[-1]))
+    return {
+        "median_seconds": statistics.median(run["seconds"] for run in runs),
+        "max_rss_mb": max(run["max_rss_mb"] for run in runs),
+        "heavy_modules": runs[-1]["heavy_modules"]
+    }
+
+def print_import_result(label, result):
+    print(f"{label}:")
+    print(f"  Import time (median): {result['median_seconds']:.3f} s")
+    print(f"  Peak RSS: {result['max_rss_mb']:.1f} MB")
+    print(f"  Heavy modules loaded: {', '.join(result['heavy_modules']) or 'none'}")
+
+def import_time(args):
+    here = os.path.dirname(os.path.abspath(__file__))
+    current = measure_import(here, args.repeat)
+
+    if args.baseline:
+        # Check the baseline revision of the module out into a temporary directory
+        source = subprocess.run(
+            ["git", "show", f"{args.baseline}:text_summariser.py"], cwd=here, check=True,
+            stdout=subprocess.PIPE, text=True
+        ).stdout
+        with tempfile.TemporaryDirectory() as baseline_dir:
+            with open(os.path.join(baseline_dir, "text_summariser.py"), "w", encoding="utf-8") as f:
+                f.write(source)
+            baseline = measure_import(baseline_dir, args.repeat)
+        print_import_result(f"Baseline ({args.baseline})", baseline)
+        print_import_result("Current", current)
+        if current["median_seconds"] > 0:
+            print(f"\nSpeedup: {baseline['median_seconds'] / current['median_seconds']:.1f}x, "
+                  f"memory saved: {baseline['max_rss_mb'] - current['max_rss_mb']:.1f} MB")
+    else:
+        print_import_result("Current", current)
+
+def count_calls(module):
+    """Attach a forward hook counting calls to module; returns (counter, hook handle)"""
+    counter = {"calls": 0}
+    def hook(*_):
+        counter["calls"] += 1
+    return counter, module.register_forward_hook(hook)
+
+def run_generation(target, draft, chunks, max_length):
+    """Greedy-decode every chunk with target, assisted by draft if given, counting decoder steps"""
+    import torch
+
+    target_steps, target_hook = count_calls(target.get_decoder())
+    hooks = [target_hook]
+    draft_steps = {"calls": 0}
+    if draft is not None:
+        draft_steps, draft_hook = count_calls(draft.get_decoder())
+        hooks.append(draft_hook)
+
+    outputs = []
+    new_tokens = 0
+    start = time.perf_counter()
+    try:
+        with torch.no_grad():
+            for inputs in chunks:
+                ids = target.generate(
+                    **inputs, max_length=max_length, num_beams=1, do_sample=False, assistant_model=draft
+                )
+                outputs.append(ids[0].tolist())
+                new_tokens += ids.shape[1] - 1  # Without the decoder start token
+    finally:
+        for hook in hooks:
+            hook.remove()
+    return {
+        "seconds": time.perf_counter() - start,
+        "new_tokens": new_tokens,
+        "target_steps": target_steps["calls"],
+        "draft_steps": draft_steps["calls"],
+        "outputs": outputs
+    }
+
+def assisted(args):
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    import text_summariser as ts
+
+    target = ts.get_summarizer(args.target)
+    draft = ts.get_summarizer(args.draft)
+
+    chunks = []
+    for path in args.texts:
+        with open(os.path.join(here, path), "r", encoding="utf-8") as f:
+            text = f.read()
+        for chunk, _ in ts.chunk_text_by_tokens(text, target.tokenizer):
+            chunks.append(target.tokenizer(chunk, return_tensors="pt", truncation=True).to(target.model.device))
+    chunks = chunks[:args.max_chunks]
+    print(f"Summarizing {len(chunks)} chunks from {', '.join(args.texts)} (max_length={args.max_length})")
+
+    # Warm up both models so the first timed call does not pay for lazy initialization
+    run_generation(target.model, draft.model, chunks[:1], args.max_length)
+
+    plain = run_generation(target.model, None, chunks, args.max_length)
+    assisted_run = run_generation(target.model, draft.model, chunks, args.max_length)
+
+    for label, result in ((f"{args.target} greedy", plain), (f"{args.target} assisted by {args.draft}", assisted_run)):
+        print(f"{label}:")
+        print(f"  Time: {result['seconds']:.2f} s for {result['new_tokens']} tokens "
+              f"({result['new_tokens'] / result['seconds']:.1f} tokens/s)")
+        print(f"  Target decoder steps: {result['target_steps']}")
+
+    # Every verification step keeps the accepted draft tokens plus one token from the target
+    accepted = assisted_run["new_tokens"] - assisted_run["target_steps"]
+    if assisted_run["draft_steps"]:
+        print(f"\nDraft tokens accepted: {accepted} of {assisted_run['draft_steps']} "
+              f"({accepted / assisted_run['draft_steps']:.1%})")
+    print(f"Speedup: {plain['seconds'] / assisted_run['seconds']:.2f}x")
+    identical = sum(a == b for a, b in zip(plain["outputs"], assisted_run["outputs"]))
+    print(f"Identical outputs: {identical} of {len(chunks)}")
+
+def calibrate(args):
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    import text_summariser as ts
+
+    text = ""
+    for path in args.texts:
+        with open(os.path.join(here, path), "r", encoding="utf-8") as f:
+            text += f.read() + "\n"
+
+    table = {}
+    for choice in args.models:
+        # Start from an empty registry so the load time is a cold load
+        ts.clear_model_registry()
+        start = time.perf_counter()
+        model = ts.get_summarizer(choice)
+        load_seconds = time.perf_counter() - start
+
+        token_chunks = ts.chunk_text_by_tokens(text, model.tokenizer)[:args.max_chunks]
+        chunks = [chunk for chunk, _ in token_chunks]
+        sizes = [n_tokens for _, n_tokens in token_chunks]
+        lengths = [(args.max_length, 30)] * len(chunks)
+        params = ts.decoding_params(choice)
+
+        # Warm up so lazy initialization is not counted as generation time
+        ts.generate_summaries(model, chunks[:1], lengths[:1], sizes=sizes[:1], **params)
+        start = time.perf_counter()
+        ts.generate_summaries(model, chunks, lengths, sizes=sizes, **params)
+        seconds = time.perf_counter() - start
+
+        table[choice] = {
+            "seconds_per_token": seconds / sum(sizes),
+            "load_seconds": load_seconds,
+            "tokens": sum(sizes)
+        }
+        print(f"{choice}: load {load_seconds:.1f} s, {table[choice]['seconds_per_token'] * 1000:.2f} ms per input token "
+              f"over {len(chunks)} chunks")
+
+    output = args.output or ts.COST_TABLE_PATH
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "models": table}, f, indent=2)
+    print(f"\nWrote cost table to {output}")
+
+def summarize_timed(ts, model, chunks, sizes, max_length, params):
+    """Summarize chunks once to warm up, then time a second run"""
+    lengths = [(max_length, 30)] * len(chunks)
+    ts.generate_summaries(model, chunks[:1], lengths[:1], sizes=sizes[:1], **params)
+    start = time.perf_counter()
+    summaries = ts.generate_summaries(model, chunks, lengths, sizes=sizes, **params)
+    return time.perf_counter() - start, " ".join(summary or "" for summary in summaries)
+
+def quantize(args):
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    import text_summariser as ts
+
+    with open(os.path.join(here, args.text), "r", encoding="utf-8") as f:
+        text = f.read()
+    with open(os.path.join(here, args.reference), "r", encoding="utf-8") as f:
+        reference = f.read()
+
+    for choice in args.models:
+        ts.clear_model_registry()
+        fp32 = ts.get_summarizer(choice, quantized=False)
+        token_chunks = ts.chunk_text_by_tokens(text, fp32.tokenizer)[:args.max_chunks]
+        chunks = [chunk for chunk, _ in token_chunks]
+        sizes = [n_tokens for _, n_tokens in token_chunks]
+        # Deterministic decoding so both variants are compared on the same search
+        params = ts.decoding_params(choice, optimize_for_rouge=False)
+
+        fp32_size = ts._estimate_model_size_mb(fp32)
+        fp32_seconds, fp32_summary = summarize_timed(ts, fp32, chunks, sizes, args.max_length, params)
+        ts.clear_model_registry()
+
+        # The first load quantizes and writes the cache, the second one reads it back
+        start = time.perf_counter()
+        ts.get_summarizer(choice, quantized=True)
+        first_load = time.perf_counter() - start
+        ts.clear_model_registry()
+        start = time.perf_counter()
+        int8 = ts.get_summarizer(choice, quantized=True)
+        cached_load = time.perf_counter() - start
+
+        int8_size = ts._estimate_model_size_mb(int8)
+        int8_seconds, int8_summary = summarize_timed(ts, int8, chunks, sizes, args.max_length, params)
+        ts.clear_model_registry()
+
+        fp32_rouge = ts.evaluate_rouge_scores(reference, fp32_summary)
+        int8_rouge = ts.evaluate_rouge_scores(reference, int8_summary)
+        agreement = ts.evaluate_rouge_scores(fp32_summary, int8_summary)
+        print(f"{choice} ({len(chunks)} chunks):")
+        print(f"  fp32: {fp32_seconds:.2f} s, {fp32_size:.0f} MB, ROUGE-1/2/L "
+              f"{fp32_rouge['rouge1']:.3f}/{fp32_rouge['rouge2']:.3f}/{fp32_rouge['rougeL']:.3f}")
+        print(f"  int8: {int8_seconds:.2f} s, {int8_size:.0f} MB, ROUGE-1/2/L "
+              f"{int8_rouge['rouge1']:.3f}/{int8_rouge['rouge2']:.3f}/{int8_rouge['rougeL']:.3f}")
+        print(f"  Speedup {fp32_seconds / int8_seconds:.2f}x, memory {int8_size / fp32_size:.0%} of fp32, "
+              f"ROUGE-L between fp32 and int8 summaries {agreement['rougeL']:.3f}")
+        print(f"  Quantized load: {first_load:.1f} s first, {cached_load:.1f} s from the disk cache")
+
+def onnx_parity(args):
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    import text_summariser as ts
+
+    with open(os.path.join(here, args.text), "r", encoding="utf-8") as f:
+        text = f.read()
+
+    failed = []
+    for choice in args.models:
+        pytorch = ts.get_summarizer(choice, backend="pytorch")
+        onnx = ts.get_summarizer(choice, backend="onnx")
+        if onnx is pytorch:
+            sys.exit("The ONNX Runtime backend is unavailable, install optimum[onnxruntime]")
+
+        token_chunks = ts.chunk_text_by_tokens(text, pytorch.tokenizer)[:args.max_chunks]
+        chunks = [chunk for chunk, _ in token_chunks]
+        sizes = [n_tokens for _, n_tokens in token_chunks]
+        # Greedy decoding, where both backends should produce the same tokens
+        params = {"do_sample": False, "num_beams": 1}
+        pytorch_seconds, _ = summarize_timed(ts, pytorch, chunks, sizes, args.max_length, params)
+        onnx_seconds, _ = summarize_timed(ts, onnx, chunks, sizes, args.max_length, params)
+
+        lengths = [(args.max_length, 30)] * len(chunks)
+        pytorch_summaries = ts.generate_summaries(pytorch, chunks, lengths, **params)
+        onnx_summaries = ts.generate_summaries(onnx, chunks, lengths, **params)
+        identical = sum(a == b for a, b in zip(pytorch_summaries, onnx_summaries))
+        agreement = min(
+            ts.evaluate_rouge_scores(a or "", b or "")["rougeL"] for a, b in zip(pytorch_summaries, onnx_summaries)
+        )
+        print(f"{choice} ({len(chunks)} chunks):")
+        print(f"  PyTorch: {pytorch_seconds:.2f} s, ONNX Runtime: {onnx_seconds:.2f} s "
+              f"({pytorch_seconds / onnx_seconds:.2f}x)")
+        print(f"  Identical summaries: {identical} of {len(chunks)}, lowest ROUGE-L agreement {agreement:.3f}")
+        if agreement < args.min_agreement:
+            failed.append(choice)
+
+    if failed:
+        sys.exit(f"Parity check failed for {', '.join(failed)}")
+
+def topics(args):
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    import text_summariser as ts
+
+    labels = list(ts.get_topic_labels())
+    documents = []
+    for name in args.texts:
+        with open(os.path.join(here, name), "r", encoding="utf-8") as f:
+            documents.append((name, f.read()))
+
+    # Warm both models up so loading is not timed
+    ts.get_zero_shot_classifier()(documents[0][1][:200], candidate_labels=labels)
+    ts.classify_topic(documents[0][1][:200])
+
+    agreed = 0
+    for name, text in documents:
+        start = time.perf_counter()
+        zero_shot = ts.get_zero_shot_classifier()(text, candidate_labels=labels)["labels"][0]
+        zero_shot_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        embedding = ts.classify_topic(text)
+        embedding_seconds = time.perf_counter() - start
+        agreed += zero_shot == embedding
+        print(f"{name}: zero-shot {zero_shot} in {zero_shot_seconds:.2f} s, "
+              f"embedding {embedding} in {embedding_seconds:.2f} s ({zero_shot_seconds / embedding_seconds:.1f}x)")
+    print(f"Same top label for {agreed} of {len(documents)} documents")
+
+    # Classification time once the label embeddings are cached, for growing taxonomies
+    document = ts.DocumentAnalysis(documents[0][1])
+    ts.document_embedding(document)
+    for count in args.label_counts:
+        taxonomy = [f"{label} {i}" for i in range(count // len(labels) + 1) for label in labels][:count]
+        ts.classify_topics(document, taxonomy)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            ts.classify_topics(document, taxonomy, top_k=5)
+        print(f"{count} labels: {(time.perf_counter() - start) / args.repeat * 1000:.2f} ms per document")
+
+def main():
+    parser = argparse.ArgumentParser(description="Performance benchmarks for the text summarizer")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    parser_import = subparsers.add_parser("import-time", help="Measure the cost of importing text_summariser")
+    parser_import.add_argument("--repeat", type=int, default=5, help="Fresh interpreters to average over")
+    parser_import.add_argument("--baseline", help="Git revision to compare against, e.g. fe2d9c9 (the last one with eager imports)")
+    parser_import.set_defaults(func=import_time)
+
+    parser_assisted = subparsers.add_parser("assisted", help="Compare plain and assisted greedy decoding")
+    parser_assisted.add_argument("--target", default="bart-large", help="Model choice that verifies tokens")
+    parser_assisted.add_argument("--draft", default="distilbart", help="Model choice that drafts tokens")
+    parser_assisted.add_argument("--texts", nargs="+", default=["global warming.txt"], help="Sample texts to summarize")
+    parser_assisted.add_argument("--max-chunks", type=int, default=8, help="Chunks to summarize at most")
+    parser_assisted.add_argument("--max-length", type=int, default=130, help="Maximum summary tokens per chunk")
+    parser_assisted.set_defaults(func=assisted)
+
+    parser_calibrate = subparsers.add_parser("calibrate", help="Measure model costs for model_choice=\"auto\"")
+    parser_calibrate.add_argument("--models", nargs="+", default=["t5-small", "distilbart", "bart-large", "t5-3b"],
+                                  help="Model choices to measure")
+    parser_calibrate.add_argument("--texts", nargs="+", default=["global warming.txt"], help="Sample texts to summarize")
+    parser_calibrate.add_argument("--max-chunks", type=int, default=4, help="Chunks to summarize per model")
+    parser_calibrate.add_argument("--max-length", type=int, default=130, help="Maximum summary tokens per chunk")
+    parser_calibrate.add_argument("--output", help="Cost table path (defaults to SUMMARIZER_COST_TABLE or model_costs.json)")
+    parser_calibrate.set_defaults(func=calibrate)
+
+    parser_quantize = subparsers.add_parser("quantize", help="Compare int8 quantized models with fp32 on CPU")
+    parser_quantize.add_argument("--models", nargs="+", default=["t5-small", "distilbart", "bart-large", "pegasus"],
+                                 help="Model choices to compare")
+    parser_quantize.add_argument("--text", default="global warming.txt", help="Sample text to summarize")
+    parser_quantize.add_argument("--reference", default="standard_gw_summary.txt", help="Reference summary for ROUGE")
+    parser_quantize.add_argument("--max-chunks", type=int, default=4, help="Chunks to summarize per model")
+    parser_quantize.add_argument("--max-length", type=int, default=130, help="Maximum summary tokens per chunk")
+    parser_quantize.set_defaults(func=quantize)
+
+    parser_onnx = subparsers.add_parser("onnx-parity", help="Check the ONNX Runtime backend against PyTorch")
+    parser_onnx.add_argument("--models", nargs="+", default=["distilbart", "bart-large", "t5-small", "pegasus"],
+                             help="Model choices to check")
+    parser_onnx.add_argument("--text", default="global warming.txt", help="Sample text to summarize")
+    parser_onnx.add_argument("--max-chunks", type=int, default=4, help="Chunks to summarize per model")
+    parser_onnx.add_argument("--max-length", type=int, default=130, help="Maximum summary tokens per chunk")
+    parser_onnx.add_argument("--min-agreement", type=float, default=0.95,
+                             help="Lowest ROUGE-L between the backends' summaries of a chunk that still passes")
+    parser_onnx.set_defaults(func=onnx_parity)
+
+    parser_topics = subparsers.add_parser("topics", help="Compare embedding topic classification with zero-shot")
+    parser_topics.add_argument("--texts", nargs="+", default=["global warming.txt"], help="Sample texts to classify")
+    parser_topics.add_argument("--label-counts", nargs="+", type=int, default=[4, 40, 400],
+                               help="Taxonomy sizes to time classification for")
+    parser_topics.add_argument("--repeat", type=int, default=20, help="Classifications to average over")
+    parser_topics.set_defaults(func=topics)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
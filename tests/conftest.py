@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+from collections import OrderedDict
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import text_summariser as ts
+from nltk.tokenize.punkt import PunktSentenceTokenizer
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(monkeypatch, tmp_path):
+    """Deterministic sentence splitting and costs, no loaded models and a private summary cache"""
+    # An untrained Punkt model splits on sentence punctuation without the downloaded data
+    monkeypatch.setattr(ts, "_punkt_tokenizer", PunktSentenceTokenizer())
+    monkeypatch.setattr(ts, "_cost_table", {})
+    monkeypatch.setattr(ts, "_generation_costs", {})
+    monkeypatch.setattr(ts, "_model_registry", OrderedDict())
+    monkeypatch.setattr(ts, "_summary_cache", ts.SummaryCache(directory=str(tmp_path / "cache")))
+
+
+class WordTokenizer:
+    """Whitespace tokenizer with the parts of the Hugging Face interface the summarizer uses"""
+
+    model_max_length = 64
+
+    def __call__(self, texts, add_special_tokens=True, **kwargs):
+        extra = 2 if add_special_tokens else 0
+        return {"input_ids": [list(range(len(text.split()) + extra)) for text in texts]}
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+
+class StubSummarizer:
+    """Summarization pipeline stand-in: each summary is the first words of its input"""
+
+    def __init__(self, seconds_per_call=0.0, words=4):
+        self.tokenizer = WordTokenizer()
+        self.seconds_per_call = seconds_per_call
+        self.words = words
+        self.calls = []
+
+    def __call__(self, texts, max_length, min_length, batch_size=None, **generate_kwargs):
+        texts = texts if isinstance(texts, list) else [texts]
+        self.calls.append(list(texts))
+        time.sleep(self.seconds_per_call)
+        return [{"summary_text": " ".join(text.split()[:self.words])} for text in texts]
+
+
+@pytest.fixture
+def stub_model(monkeypatch):
+    model = StubSummarizer()
+    monkeypatch.setattr(ts, "get_summarizer", lambda *args, **kwargs: model)
+    return model
@@ -0,0 +1,59 @@
+import threading
+import time
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def analyses(monkeypatch):
+    """One analysis worker and a private pool, with ANALYSES set by the test"""
+    monkeypatch.setitem(app.app.config, "ANALYSIS_WORKERS", 1)
+    monkeypatch.setattr(app, "analysis_pool", None)
+    yield lambda entries: monkeypatch.setattr(app, "ANALYSES", entries)
+    if app.analysis_pool is not None:
+        app.analysis_pool.shutdown(wait=True, cancel_futures=True)
+
+
+def test_results_come_back_in_display_order(analyses):
+    analyses([("slow", lambda text: time.sleep(0.1) or "slow", 5), ("fast", lambda text: "fast", 5)])
+    results, timings = app.collect_analyses(app.start_analyses("document"))
+    assert results == {"slow": "slow", "fast": "fast"}
+    assert list(timings) == ["slow", "fast"]
+    assert timings["slow"]["status"] == "ok"
+    assert timings["slow"]["ms"] >= 100
+
+
+def test_failures_are_reported_as_errors(analyses):
+    def fail(text):
+        raise RuntimeError("broken")
+
+    analyses([("broken", fail, 5)])
+    results, timings = app.collect_analyses(app.start_analyses("document"))
+    assert results == {"broken": None}
+    assert timings["broken"]["status"] == "error"
+
+
+def test_queued_analyses_time_out_from_submission_and_are_cancelled(analyses):
+    release = threading.Event()
+    ran = []
+    analyses([
+        ("blocking", lambda text: release.wait(5), 0.2),
+        ("queued", lambda text: ran.append(text), 0.3),
+    ])
+    try:
+        start = time.monotonic()
+        jobs = app.start_analyses("document")
+        results, timings = app.collect_analyses(jobs)
+        elapsed = time.monotonic() - start
+    finally:
+        release.set()
+
+    # The panel waits for the largest timeout, not the sum of them
+    assert elapsed < 0.5
+    assert results == {"blocking": None, "queued": None}
+    assert [timing["status"] for timing in timings.values()] == ["timeout", "timeout"]
+    assert jobs[1]["future"].cancelled()
+    app.analysis_pool.shutdown(wait=True)
+    assert ran == []
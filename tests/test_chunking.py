@@ -0,0 +1,104 @@
+import random
+
+import text_summariser as ts
+
+
+def make_sentences(count, seed=0):
+    rng = random.Random(seed)
+    words = "alpha beta gamma delta epsilon zeta eta theta iota kappa".split()
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(5, 25))).capitalize() + "." for _ in range(count)]
+
+
+def pack(sizes, budget, overlap=0, anchors=None, min_gap=0):
+    return ts.SentenceIndex("").pack(sizes, budget, overlap, anchors, min_gap)
+
+
+def test_pack_fills_ranges_up_to_the_budget():
+    assert pack([3, 3, 3, 3, 3], 7) == [(0, 2), (2, 4), (4, 5)]
+
+
+def test_pack_gives_an_oversized_sentence_its_own_range():
+    assert pack([2, 10, 2], 5) == [(0, 1), (1, 2), (2, 3)]
+
+
+def test_pack_repeats_trailing_sentences_as_overlap():
+    ranges = pack([2] * 6, 6, overlap=2)
+    assert ranges[0] == (0, 3)
+    assert ranges[1][0] == 2
+    assert ranges[-1][1] == 6
+
+
+def test_pack_ends_ranges_at_cut_points():
+    anchors = [False, True, False, False, False, False]
+    assert pack([2] * 6, 10, anchors=anchors) == [(0, 2), (2, 6)]
+
+
+def test_pack_ignores_anchors_closer_than_min_gap_to_the_previous_anchor():
+    anchors = [True, True, False, False, False, False]
+    # Each anchor lies only 2 after the previous one (or the start), so neither is a cut point
+    assert pack([2] * 6, 12, anchors=anchors, min_gap=3) == [(0, 6)]
+
+
+def test_content_anchors_depend_on_the_sentence_alone():
+    sentences = make_sentences(200)
+    sizes = [len(sentence.split()) for sentence in sentences]
+    anchors = ts.content_anchors(sentences, sizes, 60)
+    shifted = ts.content_anchors(["A new first sentence."] + sentences, [4] + sizes, 60)
+    assert shifted[1:] == anchors
+    assert 0 < sum(anchors) < len(anchors)
+
+
+def test_content_defined_ranges_resynchronize_after_an_edit():
+    sentences = make_sentences(400)
+    edited = sentences[:50] + ["An inserted sentence about something else entirely."] + sentences[50:]
+    budget = 100
+
+    def chunks(sentences):
+        sizes = [len(sentence.split()) for sentence in sentences]
+        anchors = ts.content_anchors(sentences, sizes, budget * ts.CHUNK_ANCHOR_SPACING)
+        ranges = pack(sizes, budget, anchors=anchors, min_gap=budget * ts.CHUNK_ANCHOR_MIN_GAP)
+        return [" ".join(sentences[first:last]) for first, last in ranges]
+
+    before, after = chunks(sentences), chunks(edited)
+    changed = set(after) - set(before)
+    assert 1 <= len(changed) <= 3
+
+
+def test_chunk_length_budget_single_chunk_is_capped_by_the_chunk():
+    max_length, min_length = ts.chunk_length_budget(100, 1, 150)
+    assert max_length == 40
+    assert min_length == 5
+
+
+def test_chunk_length_budget_rounds_the_share_to_steps():
+    step = ts.SUMMARY_LENGTH_STEP
+    # 150 words over 3 chunks is 50, rounded down to 48
+    assert ts.chunk_length_budget(400, 3, 150) == (48 + 10, 20)
+    # From max_words / (2 * step) chunks on the share stays at its floor
+    assert ts.chunk_length_budget(400, 5, 150) == ts.chunk_length_budget(400, 50, 150) == (step + 10, 20)
+
+
+def test_chunk_length_budget_keeps_min_below_max():
+    for words in (1, 5, 20, 200, 2000):
+        for count in (1, 2, 10):
+            max_length, min_length = ts.chunk_length_budget(words, count, 150)
+            assert min_length < max_length
+
+
+def test_text_pieces_keeps_short_texts_whole():
+    assert ts.text_pieces("One. Two.", max_chars=100) == ["One. Two."]
+
+
+def test_text_pieces_split_at_sentences_within_the_limit():
+    text = " ".join(make_sentences(60))
+    pieces = ts.text_pieces(text, max_chars=300)
+    assert all(len(piece) <= 300 for piece in pieces)
+    assert " ".join(piece.strip() for piece in pieces).split() == text.split()
+    assert all(piece.rstrip().endswith(".") for piece in pieces)
+
+
+def test_text_pieces_cut_an_overlong_sentence_at_whitespace():
+    text = " ".join(["word"] * 100) + "."
+    pieces = ts.text_pieces(text, max_chars=50)
+    assert all(len(piece) <= 50 for piece in pieces)
+    assert "".join(pieces).split() == text.split()
@@ -0,0 +1,73 @@
+import pytest
+
+import text_summariser as ts
+
+
+def words(count):
+    return " ".join(["word"] * count)
+
+
+def test_route_model_sends_short_inputs_to_the_extractive_summarizer():
+    assert ts.route_model(words(100), 150) == ts.EXTRACTIVE_MODEL
+
+
+def test_route_model_picks_the_best_model_that_fits_the_tier():
+    # 1300 tokens: bart-large needs 3.9 s plus 12 s to load, t5-small 0.5 s plus 2 s
+    assert ts.route_model(words(1000), 150, "standard") == "bart-large"
+    assert ts.route_model(words(1000), 150, "interactive") == "t5-small"
+
+
+def test_route_model_keeps_t5_3b_for_long_inputs():
+    assert ts.route_model(words(500), 100, "batch") != "t5-3b"
+    assert ts.route_model(words(2000), 100, "batch") == "t5-3b"
+
+
+def test_route_model_skips_the_load_time_of_resident_models(monkeypatch):
+    monkeypatch.setattr(ts, "_model_resident", lambda model_name: True)
+    assert ts.route_model(words(1000), 150, "interactive") == "distilbart"
+
+
+def test_route_model_rejects_unknown_tiers():
+    with pytest.raises(ValueError):
+        ts.route_model(words(1000), 150, "urgent")
+
+
+def test_plan_keeps_the_extractive_summarizer_undegraded():
+    plan = ts.plan_summary(words(1000), ts.EXTRACTIVE_MODEL, 150, 1, {})
+    assert plan["model_choice"] == ts.EXTRACTIVE_MODEL
+    assert not plan["degraded"]
+
+
+def test_plan_keeps_the_request_when_it_fits():
+    params = ts.decoding_params("bart-large")
+    plan = ts.plan_summary(words(1000), "bart-large", 150, 60000, params)
+    assert plan["model_choice"] == "bart-large"
+    assert plan["params"] == params
+    assert not plan["degraded"]
+
+
+def test_plan_counts_the_load_time_of_a_model_that_is_not_resident(monkeypatch):
+    params = ts.decoding_params("bart-large")
+    # Generation alone takes 3.9 s, but loading bart-large adds 12 s to an 8 s budget
+    plan = ts.plan_summary(words(1000), "bart-large", 150, 10000, params)
+    assert plan["model_choice"] == ts.EXTRACTIVE_MODEL
+    assert plan["degraded"]
+
+    monkeypatch.setattr(ts, "_model_resident", lambda model_name: True)
+    plan = ts.plan_summary(words(1000), "bart-large", 150, 10000, params)
+    assert plan["model_choice"] == "bart-large"
+    assert not plan["degraded"]
+
+
+def test_plan_degrades_to_greedy_decoding_first(monkeypatch):
+    monkeypatch.setattr(ts, "_model_resident", lambda model_name: True)
+    # 3.9 s with the default beams does not fit a 3.2 s budget, 1.3 s greedy does
+    plan = ts.plan_summary(words(1000), "bart-large", 150, 4000, ts.decoding_params("bart-large"))
+    assert plan["model_choice"] == "bart-large"
+    assert plan["params"] == ts.GREEDY_PARAMS
+    assert plan["degraded"]
+
+
+def test_plan_accepts_unknown_model_choices():
+    plan = ts.plan_summary(words(1000), "not-a-model", 150, 60000, {"do_sample": False})
+    assert plan["model_choice"] == "not-a-model"
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import text_summariser as ts
+from conftest import StubSummarizer
+
+
+def chunks(count):
+    return [f"chunk number {i} with a few words" for i in range(count)]
+
+
+def test_scheduler_resolves_each_batch_as_it_finishes(stub_model):
+    stub_model.seconds_per_call = 0.1
+    scheduler = ts.BatchScheduler("stub", window_ms=10, max_batch_size=4)
+    futures = [scheduler.submit(chunk, 20, 5) for chunk in chunks(12)]
+
+    assert futures[0].result(timeout=5) == "chunk number 0 with"
+    assert not futures[-1].done()
+    assert [future.result(timeout=5) for future in futures][-1] == "chunk number 11 with"
+    assert [len(call) for call in stub_model.calls] == [4, 4, 4]
+
+
+def test_scheduler_interleaves_requests_from_different_threads(stub_model):
+    scheduler = ts.BatchScheduler("stub", window_ms=200, max_batch_size=4)
+    futures = [scheduler.submit(chunk, 20, 5) for chunk in chunks(8)]
+    other = []
+    thread = threading.Thread(target=lambda: other.append(scheduler.submit("another request", 20, 5)))
+    thread.start()
+    thread.join()
+
+    assert other[0].result(timeout=5) == "another request"
+    assert "another request" in stub_model.calls[0]
+    for future in futures:
+        future.result(timeout=5)
+
+
+def test_scheduler_skips_cancelled_chunks(stub_model):
+    scheduler = ts.BatchScheduler("stub", window_ms=100, max_batch_size=4)
+    futures = [scheduler.submit(chunk, 20, 5) for chunk in chunks(6)]
+    for future in futures[2:]:
+        assert future.cancel()
+
+    assert [future.result(timeout=5) for future in futures[:2]] == ["chunk number 0 with", "chunk number 1 with"]
+    time.sleep(0.05)
+    assert stub_model.calls == [chunks(6)[:2]]
+
+
+def test_scheduled_chunks_past_the_deadline_time_out_and_are_cancelled(stub_model):
+    stub_model.seconds_per_call = 0.2
+    scheduler = ts.BatchScheduler("stub", window_ms=0, max_batch_size=4)
+    deadline = time.monotonic() + 0.3
+    results = list(ts.iter_scheduled_until(deadline, scheduler, chunks(16), [(20, 5)] * 16))
+
+    assert [i for i, _, _ in results] == list(range(16))
+    # The first batch finished in time, the second was running at the deadline
+    assert all(summary is not None and not timed_out for _, summary, timed_out in results[:4])
+    assert all(timed_out for _, _, timed_out in results[8:])
+    time.sleep(0.5)
+    assert len(stub_model.calls) == 2
+
+
+def test_summaries_until_the_deadline_skip_batches_that_do_not_fit():
+    model = StubSummarizer()
+    lengths = [(20, 5)] * 6
+    results = list(ts.iter_summaries_until(time.monotonic() - 1, model, chunks(6), lengths, batch_size=2))
+    assert all(timed_out and summary is None for _, summary, timed_out in results)
+    assert model.calls == []
+
+    results = list(ts.iter_summaries_until(None, model, chunks(6), lengths, batch_size=2))
+    assert [summary for _, summary, _ in results] == [" ".join(chunk.split()[:4]) for chunk in chunks(6)]
+
+
+def test_stream_reports_the_routed_model(stub_model, monkeypatch):
+    monkeypatch.setattr(ts, "route_model", lambda text, max_words, latency_tier: "distilbart")
+    events = list(ts.summarize_text_stream("One sentence here. Another one there.", "auto", 20, use_cache=False))
+    assert events[0] == {"event": "model", "model_choice": "distilbart"}
+    assert events[-1]["event"] == "summary"
+
+
+def test_stream_without_polish_joins_summaries_as_written(stub_model):
+    stub_model.tokenizer.model_max_length = 12
+    text = "First sentence has six words. Second sentence has six words. Third sentence has six words."
+    events = list(ts.summarize_text_stream(text, "bart-large", 10, use_cache=False, params={"do_sample": False},
+                                           chunk_lengths=(10, 2), polish=False))
+    assert [event["summary"] for event in events if event["event"] == "chunk"] == [
+        "First sentence has six", "Second sentence has six", "Third sentence has six"
+    ]
+    assert events[-1] == {"event": "summary", "summary": "First sentence has six Second sentence has six Third sentence",
+                          "degraded": False}
+
+
+def test_stream_caches_whole_summaries(stub_model):
+    text = "One sentence here. Another one there."
+    first = list(ts.summarize_text_stream(text, "bart-large", 20))
+    calls = len(stub_model.calls)
+    second = list(ts.summarize_text_stream(text, "bart-large", 20))
+    assert len(stub_model.calls) == calls
+    assert second[0] == {"event": "chunks", "total": 0, "cached": True}
+    assert second[-1]["summary"] == first[-1]["summary"]
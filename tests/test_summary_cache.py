@@ -0,0 +1,68 @@
+import os
+import time
+
+import text_summariser as ts
+
+
+def test_keys_are_stable_and_depend_on_every_part(tmp_path):
+    cache = ts.SummaryCache(directory=str(tmp_path))
+    key = cache.key("summary", "text", "bart-large", 150, {"do_sample": False})
+    assert key == cache.key("summary", "text", "bart-large", 150, {"do_sample": False})
+    assert key != cache.key("summary", "text", "bart-large", 151, {"do_sample": False})
+    assert key != cache.key("summary", "text", "bart-large", 150, {"do_sample": True})
+
+
+def test_keys_include_the_code_version(tmp_path, monkeypatch):
+    cache = ts.SummaryCache(directory=str(tmp_path))
+    key = cache.key("summary", "text")
+    monkeypatch.setattr(ts, "_code_version", "another version")
+    assert cache.key("summary", "text") != key
+
+
+def test_values_survive_in_memory_and_on_disk(tmp_path):
+    cache = ts.SummaryCache(directory=str(tmp_path))
+    key = cache.key("x")
+    cache.set(key, "summary")
+    assert cache.get(key) == "summary"
+    assert cache.memory_hits == 1
+
+    fresh = ts.SummaryCache(directory=str(tmp_path))
+    assert fresh.get(key) == "summary"
+    assert fresh.disk_hits == 1
+    assert fresh.get(fresh.key("y")) is None
+    assert fresh.misses == 1
+
+
+def test_memory_hits_mark_the_disk_entry_as_used(tmp_path):
+    cache = ts.SummaryCache(directory=str(tmp_path))
+    key = cache.key("x")
+    cache.set(key, "summary")
+    path = cache._path(key)
+    os.utime(path, (1000, 1000))
+    assert cache.get(key) == "summary"
+    assert cache.memory_hits == 1
+    assert os.path.getmtime(path) > time.time() - 60
+
+
+def test_entries_older_than_max_age_are_dropped(tmp_path):
+    cache = ts.SummaryCache(directory=str(tmp_path), max_age=60, memory_items=0)
+    key = cache.key("x")
+    cache.set(key, "summary")
+    path = cache._path(key)
+    os.utime(path, (time.time() - 120, time.time() - 120))
+    assert cache.get(key) is None
+    assert not os.path.exists(path)
+
+
+def test_least_recently_used_entries_are_evicted_over_the_size_limit(tmp_path):
+    cache = ts.SummaryCache(directory=str(tmp_path), max_bytes=1000, memory_items=0)
+    keys = [cache.key(i) for i in range(10)]
+    for age, key in enumerate(keys):
+        cache.set(key, "x" * 150)
+        # Oldest first, so eviction order is well defined
+        mtime = time.time() - 1000 + age
+        os.utime(cache._path(key), (mtime, mtime))
+
+    assert cache._disk_bytes <= 1000
+    assert not os.path.exists(cache._path(keys[0]))
+    assert os.path.exists(cache._path(keys[-1]))
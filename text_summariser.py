@@ -1,36 +1,22 @@
-<<<<<<< HEAD
 import re
 import json
 import logging
-import nltk
-from transformers import pipeline
-from textwrap import wrap
-from langdetect import detect
-from nltk.corpus import stopwords
-from textblob import TextBlob
-from deep_translator import GoogleTranslator
-from nltk.tokenize import sent_tokenize, word_tokenize
-from rake_nltk import Rake
-import spacy
-import PyPDF2
-import pytesseract
-from PIL import Image
-import whisper
-from fpdf import FPDF
-from docx import Document
-import textstat
-import easyocr 
-import speech_recognition as sr
-import torch
-import openai
+import threading
+import time
+import gc
+import itertools
+import queue
+import bisect
+import hashlib
+import tempfile
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 import os
-from pydub import AudioSegment
-import librosa
-import torch
-from transformers import Wav2Vec2ForCTC, Wav2Vec2Tokenizer
-import cv2
-from transformers import VisionEncoderDecoderModel, ViTImageProcessor, AutoTokenizer
 
+# Heavy dependencies (NLTK, transformers, torch, spaCy, OCR, audio and video libraries,
+# file writers) are imported inside the functions that use them, so a text-only worker
+# does not pay for code paths it never runs.
 
 # Initialize necessary components
 logging.basicConfig(filename="summarizer.log", level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -39,12 +25,500 @@ models = {
     "bart-large": "facebook/bart-large-cnn",
     "distilbart": "sshleifer/distilbart-cnn-12-6",
     "pegasus": "google/pegasus-xsum",
-    "t5-3b": "t5-3b"
+    "t5-3b": "t5-3b",
+    "extractive": None  # Sentence-ranking summarizer on CPU, no transformer model
 }
-stopwords.words("english")  # Download if not already done
-nlp = spacy.load("en_core_web_sm")
+EXTRACTIVE_MODEL = "extractive"
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+def get_nlp():
+    """Load the spaCy English model on first use"""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                import spacy
+                _nlp = spacy.load("en_core_web_sm")
+    return _nlp
+
+# Model Registry
+# Every model is loaded once per (task, model name, dtype, device) and shared across calls.
+# When the combined size of the resident models exceeds the budget, the least recently
+# used ones are evicted.
+MODEL_MEMORY_BUDGET_MB = int(os.environ.get("SUMMARIZER_MODEL_BUDGET_MB", "8192"))
+_model_registry = OrderedDict()
+_model_registry_lock = threading.Lock()
+_model_load_locks = {}
+
+def default_device():
+    """Pipeline device index: the first GPU when available, otherwise CPU"""
+    import torch
+    return 0 if torch.cuda.is_available() else -1
+
+def _estimate_model_size_mb(instance):
+    """Approximate memory held by a loaded model from its parameters and buffers"""
+    import torch
+    parts = instance if isinstance(instance, (tuple, list)) else (instance,)
+    total_bytes = 0
+    for part in parts:
+        module = getattr(part, "model", part)  # Pipelines wrap the underlying model
+        save_dir = getattr(module, "model_save_dir", None)
+        if not isinstance(module, torch.nn.Module) and save_dir is not None:
+            # ONNX Runtime sessions hold roughly the size of their exported graphs
+            save_dir = str(save_dir)
+            total_bytes += sum(os.path.getsize(os.path.join(save_dir, name)) for name in os.listdir(save_dir))
+        if isinstance(module, torch.nn.Module):
+            for tensor in itertools.chain(module.parameters(), module.buffers()):
+                total_bytes += tensor.numel() * tensor.element_size()
+            for submodule in module.modules():
+                # Dynamically quantized layers keep their packed weights outside parameters()
+                if hasattr(submodule, "_weight_bias"):
+                    for tensor in submodule._weight_bias():
+                        if tensor is not None:
+                            total_bytes += tensor.numel() * tensor.element_size()
+    return total_bytes / (1024 * 1024)
+
+def _load_pipeline(task, model_name, dtype=None, device=-1):
+    """Default registry loader: a transformers pipeline for the given task"""
+    from transformers import pipeline
+    kwargs = {"framework": "pt", "device": device}
+    if dtype is not None:
+        kwargs["torch_dtype"] = dtype
+    return pipeline(task, model=model_name, **kwargs)
+
+def _evict_models(keep=None):
+    """Evict least recently used models until the registry fits the budget. Caller holds the registry lock."""
+    total_mb = sum(entry["size_mb"] for entry in _model_registry.values())
+    evicted = False
+    for key in list(_model_registry):
+        if total_mb <= MODEL_MEMORY_BUDGET_MB:
+            break
+        if key == keep:
+            continue
+        entry = _model_registry.pop(key)
+        total_mb -= entry["size_mb"]
+        evicted = True
+        logging.info(f"Evicted model {key[1]} ({key[0]}, {entry['size_mb']:.0f} MB) from the registry")
+    if evicted:
+        gc.collect()
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+def get_model(task, model_name, dtype=None, device=None, loader=None):
+    """
+    Return the shared instance of a model, loading it on first use.
+
+    :param task: Pipeline task, or a registry label when a custom loader is given (e.g. "wav2vec2").
+    :param model_name: Hugging Face model identifier.
+    :param dtype: Optional torch dtype the model is loaded in.
+    :param device: Pipeline device index (defaults to the first GPU when available) or "auto".
+    :param loader: Optional zero-argument callable that builds the instance instead of a pipeline.
+    :return: The cached model instance.
+    """
+    if device is None:
+        device = default_device()
+    key = (task, model_name, str(dtype) if dtype is not None else None, device)
+
+    with _model_registry_lock:
+        entry = _model_registry.get(key)
+        if entry is not None:
+            _model_registry.move_to_end(key)
+            return entry["model"]
+        load_lock = _model_load_locks.setdefault(key, threading.Lock())
+
+    # Load outside the registry lock so other models stay available, but only once per key
+    with load_lock:
+        with _model_registry_lock:
+            entry = _model_registry.get(key)
+            if entry is not None:
+                _model_registry.move_to_end(key)
+                return entry["model"]
+
+        start = time.time()
+        if loader is None:
+            instance = _load_pipeline(task, model_name, dtype=dtype, device=device)
+        else:
+            instance = loader()
+        load_time = time.time() - start
+        size_mb = _estimate_model_size_mb(instance)
+
+        with _model_registry_lock:
+            _model_registry[key] = {
+                "model": instance,
+                "size_mb": size_mb,
+                "load_time": load_time,
+                "loaded_at": time.time()
+            }
+            _evict_models(keep=key)
+        logging.info(f"Loaded model {model_name} ({task}) in {load_time:.1f}s, {size_mb:.0f} MB")
+        return instance
+
+def set_model_memory_budget(budget_mb):
+    """Change the registry memory budget, evicting models if the new budget is already exceeded"""
+    global MODEL_MEMORY_BUDGET_MB
+    with _model_registry_lock:
+        MODEL_MEMORY_BUDGET_MB = budget_mb
+        _evict_models()
+
+def loaded_models():
+    """Describe the models currently resident in the registry, most recently used last"""
+    with _model_registry_lock:
+        return [
+            {
+                "task": key[0],
+                "model": key[1],
+                "dtype": key[2],
+                "device": key[3],
+                "size_mb": round(entry["size_mb"], 1),
+                "load_time": round(entry["load_time"], 2),
+                "loaded_at": entry["loaded_at"]
+            }
+            for key, entry in _model_registry.items()
+        ]
+
+def clear_model_registry():
+    """Drop every cached model"""
+    with _model_registry_lock:
+        _model_registry.clear()
+    gc.collect()
+    import torch
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+# Large model loading
+# t5-3b is only loaded after checking that the memory it needs is actually there: on the GPU,
+# in RAM, or in RAM with the remaining layers offloaded to disk, in that order of preference.
+RAM_RESERVE_MB = int(os.environ.get("SUMMARIZER_RAM_RESERVE_MB", "2048"))  # Left free for the rest of the process
+MIN_RESIDENT_FRACTION = 0.25  # Share of a model that must fit in RAM for disk offload to be worth it
+MODEL_MEMORY_OVERHEAD = 1.2  # Activations, buffers and allocator slack on top of the weights
+OFFLOAD_DIR = os.environ.get(
+    "SUMMARIZER_OFFLOAD_DIR", os.path.join(os.path.expanduser("~"), ".cache", "text_summariser", "offload")
+)
+_load_plans = {}
+
+def available_memory_mb():
+    """RAM this process can still allocate in MB, honouring container (cgroup) limits; None if unknown"""
+    available = None
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    available = int(line.split()[1]) / 1024
+                    break
+    except OSError:
+        pass
+    
+    # cgroup v2, then v1: the container limit minus what is already charged to it
+    for limit_path, usage_path in (("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+                                   ("/sys/fs/cgroup/memory/memory.limit_in_bytes", "/sys/fs/cgroup/memory/memory.usage_in_bytes")):
+        try:
+            with open(limit_path, "r") as f:
+                limit = f.read().strip()
+            with open(usage_path, "r") as f:
+                usage = int(f.read().strip())
+        except (OSError, ValueError):
+            continue
+        if limit.isdigit() and int(limit) < 2 ** 60:
+            cgroup_available = (int(limit) - usage) / (1024 * 1024)
+            available = cgroup_available if available is None else min(available, cgroup_available)
+        break
+    return available
+
+def estimate_model_memory_mb(model_name, dtype):
+    """Memory the weights of a seq2seq model take in a dtype, counted on the meta device without loading them"""
+    import torch
+    from transformers import AutoConfig, AutoModelForSeq2SeqLM
+    config = AutoConfig.from_pretrained(model_name)
+    with torch.device("meta"):
+        skeleton = AutoModelForSeq2SeqLM.from_config(config)
+    parameters = sum(parameter.numel() for parameter in skeleton.parameters())
+    return parameters * torch.finfo(dtype).bits / 8 / (1024 * 1024)
+
+def plan_model_load(model_name):
+    """
+    Decide how to load a large model before allocating anything.
+
+    :return: Dict with the "strategy" ("gpu", "cpu" or "offload"), the "dtype", the memory
+             "required_mb" and what is available. Raises MemoryError when even disk offload would
+             not leave enough of the model in RAM.
+    """
+    import importlib.util
+    import torch
+    
+    gpu_available_mb = None
+    if torch.cuda.is_available():
+        gpu_available_mb = torch.cuda.mem_get_info()[0] / (1024 * 1024)
+    # Half precision on GPU; bfloat16 on CPU, where float16 kernels are slow or missing
+    dtype = torch.float16 if gpu_available_mb is not None else torch.bfloat16
+    required_mb = estimate_model_memory_mb(model_name, dtype) * MODEL_MEMORY_OVERHEAD
+    ram_mb = available_memory_mb()
+    usable_ram_mb = None if ram_mb is None else max(0.0, ram_mb - RAM_RESERVE_MB)
+    
+    # Without accelerate the model is loaded whole in RAM and then moved, with no device_map or offload
+    has_accelerate = importlib.util.find_spec("accelerate") is not None
+    plan = {
+        "model": model_name,
+        "dtype": str(dtype),
+        "accelerate": has_accelerate,
+        "required_mb": round(required_mb),
+        "available_ram_mb": None if ram_mb is None else round(ram_mb),
+        "available_gpu_mb": None if gpu_available_mb is None else round(gpu_available_mb)
+    }
+    # Without accelerate the weights pass through RAM on their way to the GPU
+    fits_ram = usable_ram_mb is None or usable_ram_mb >= required_mb
+    if gpu_available_mb is not None and gpu_available_mb >= required_mb and (has_accelerate or fits_ram):
+        plan["strategy"] = "gpu"
+    elif fits_ram:
+        plan["strategy"] = "cpu"
+    elif usable_ram_mb >= required_mb * MIN_RESIDENT_FRACTION and has_accelerate:
+        # Keep what fits in RAM and memory-map the remaining layers from disk
+        plan["strategy"] = "offload"
+        plan["max_ram_mb"] = round(usable_ram_mb)
+        plan["offload_folder"] = os.path.join(OFFLOAD_DIR, model_name.replace("/", "--"))
+    else:
+        raise MemoryError(
+            f"{model_name} needs about {required_mb:.0f} MB but only {usable_ram_mb:.0f} MB of RAM can be used"
+            + ("" if has_accelerate else " and accelerate is not installed for disk offload")
+        )
+    return plan
+
+def _load_t5_3b(model_name):
+    """Load t5-3b with the strategy chosen by plan_model_load, on GPU, CPU or partly offloaded to disk"""
+    import torch
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+    
+    plan = plan_model_load(model_name)
+    _load_plans[model_name] = plan
+    logging.info(f"Loading {model_name} with plan {plan}")
+    
+    dtype = torch.float16 if plan["dtype"] == str(torch.float16) else torch.bfloat16
+    kwargs = {"torch_dtype": dtype}
+    # low_cpu_mem_usage and device_map both require accelerate in transformers
+    if plan["accelerate"]:
+        kwargs["low_cpu_mem_usage"] = True
+        if plan["strategy"] == "gpu":
+            kwargs["device_map"] = "auto"
+        elif plan["strategy"] == "offload":
+            # Safetensors checkpoints are memory-mapped in place instead of being copied to the folder
+            kwargs["device_map"] = "auto"
+            kwargs["max_memory"] = {"cpu": f"{plan['max_ram_mb']}MB"}
+            kwargs["offload_folder"] = plan["offload_folder"]
+            kwargs["offload_state_dict"] = True
+    
+    t5_model = AutoModelForSeq2SeqLM.from_pretrained(model_name, **kwargs)
+    t5_model.eval()
+    
+    pipeline_kwargs = {}
+    if plan["strategy"] == "gpu" and not plan["accelerate"]:
+        t5_model.to("cuda")
+        pipeline_kwargs["device"] = 0
+    
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = pipeline("summarization", model=t5_model, tokenizer=tokenizer, framework="pt", **pipeline_kwargs)
+    logging.info(f"Successfully loaded {model_name} ({plan['strategy']})")
+    return model
+
+def load_plans():
+    """Plans chosen for the large models loaded so far, by model name"""
+    return dict(_load_plans)
+
+# Dynamic int8 quantization of Linear layers for CPU-only workers, opted into per process
+QUANTIZE_MODELS = os.environ.get("SUMMARIZER_QUANTIZE", "").lower() in ("1", "true", "int8")
+QUANTIZED_MODEL_DIR = os.environ.get(
+    "SUMMARIZER_QUANTIZED_DIR", os.path.join(os.path.expanduser("~"), ".cache", "text_summariser", "quantized")
+)
+
+def _load_quantized_summarizer(model_name):
+    """Summarization pipeline on CPU with its Linear layers quantized to int8, reusing a quantized copy from disk"""
+    import torch
+    import transformers
+    from transformers import AutoConfig, AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+    
+    # Parameter names and packed int8 layouts depend on the library versions that wrote the file
+    filename = f"{model_name.replace('/', '--')}-torch{torch.__version__}-transformers{transformers.__version__}.state_dict.pt"
+    path = os.path.join(QUANTIZED_MODEL_DIR, filename)
+    model = None
+    if os.path.exists(path):
+        try:
+            # Build the int8 structure from the config alone and fill it from the cached tensors;
+            # weights_only keeps a tampered file in the shared cache directory from running code
+            model = AutoModelForSeq2SeqLM.from_config(AutoConfig.from_pretrained(model_name))
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            model.load_state_dict(torch.load(path, weights_only=True))
+            logging.info(f"Loaded quantized {model_name} from {path}")
+        except Exception as e:
+            logging.warning(f"Could not load quantized {model_name} from {path}, quantizing it again: {e}")
+            model = None
+    if model is None:
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        tmp_path = None
+        try:
+            os.makedirs(QUANTIZED_MODEL_DIR, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=QUANTIZED_MODEL_DIR, suffix=".tmp")
+            os.close(fd)
+            torch.save(model.state_dict(), tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            # The quantized model is still usable, it just gets quantized again next time
+            logging.warning(f"Could not cache quantized {model_name}: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    model.eval()
+    return pipeline("summarization", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name), framework="pt", device=-1)
+
+# Inference backend per model choice, e.g. "bart-large=onnx,distilbart=onnx"; PyTorch otherwise
+SUMMARIZER_BACKENDS = dict(
+    item.split("=", 1) for item in os.environ.get("SUMMARIZER_BACKENDS", "").replace(" ", "").split(",") if "=" in item
+)
+ONNX_MODEL_DIR = os.environ.get(
+    "SUMMARIZER_ONNX_DIR", os.path.join(os.path.expanduser("~"), ".cache", "text_summariser", "onnx")
+)
+_onnx_failures = {}  # Model name -> error for models the ONNX backend could not export or load
+
+def backend_failures():
+    """Models running on PyTorch because their ONNX Runtime backend failed, with the error"""
+    return dict(_onnx_failures)
+
+def _load_onnx_summarizer(model_name):
+    """Summarization pipeline generating through ONNX Runtime on CPU with a KV cache, exporting the model on first use"""
+    import shutil
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer, pipeline
+    
+    export_dir = os.path.join(ONNX_MODEL_DIR, model_name.replace("/", "--"))
+    if os.path.isdir(export_dir):
+        model = ORTModelForSeq2SeqLM.from_pretrained(export_dir, use_cache=True, provider="CPUExecutionProvider")
+        logging.info(f"Loaded ONNX export of {model_name} from {export_dir}")
+    else:
+        # Export the encoder and the decoders with and without past key values once
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, use_cache=True, provider="CPUExecutionProvider")
+        tmp_dir = None
+        try:
+            # Save next to the final location and rename, so a half-written export is never picked up
+            os.makedirs(ONNX_MODEL_DIR, exist_ok=True)
+            tmp_dir = tempfile.mkdtemp(dir=ONNX_MODEL_DIR, suffix=".tmp")
+            model.save_pretrained(tmp_dir)
+            os.replace(tmp_dir, export_dir)
+        except Exception as e:
+            logging.warning(f"Could not cache the ONNX export of {model_name}: {e}")
+            if tmp_dir is not None:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+    return pipeline("summarization", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name))
+
+def get_summarizer(model_choice, quantized=None, backend=None):
+    """
+    Shared summarization pipeline for a model choice, falling back to bart-large-cnn if t5-3b cannot be loaded.
+
+    :param quantized: Load the int8 quantized CPU variant (defaults to SUMMARIZER_QUANTIZE).
+                      t5-3b is never quantized, it has its own memory handling.
+    :param backend: "pytorch" or "onnx" (defaults to the model's entry in SUMMARIZER_BACKENDS).
+                    The ONNX Runtime backend needs optimum[onnxruntime]; without it, for t5-3b, or
+                    once exporting or loading a model for it has failed, PyTorch is used.
+    """
+    model_name = models.get(model_choice) or "facebook/bart-large-cnn"
+    if backend is None:
+        backend = SUMMARIZER_BACKENDS.get(model_choice, "pytorch")
+    if backend == "onnx" and model_choice != "t5-3b" and model_name not in _onnx_failures:
+        try:
+            return get_model("summarization", model_name, dtype="onnx", device=-1,
+                             loader=lambda: _load_onnx_summarizer(model_name))
+        except Exception as e:
+            # Remember the failure so later requests do not retry a slow export that will fail again
+            _onnx_failures[model_name] = str(e)
+            logging.error(f"ONNX Runtime backend failed for {model_choice} ({e}), running it on PyTorch")
+    if quantized is None:
+        quantized = QUANTIZE_MODELS
+    if quantized and model_choice != "t5-3b":
+        return get_model("summarization", model_name, dtype="qint8", device=-1,
+                         loader=lambda: _load_quantized_summarizer(model_name))
+    if model_choice == "t5-3b":
+        try:
+            # The loader checks the available memory first and picks the dtype and placement itself
+            return get_model("summarization", model_name, dtype="planned", device="auto",
+                             loader=lambda: _load_t5_3b(model_name))
+        except Exception as e:
+            logging.error(f"Failed to load t5-3b model: {e}. Falling back to bart-large-cnn.")
+            model_name = "facebook/bart-large-cnn"
+    return get_model("summarization", model_name)
+
+def get_qa_model(model_name="deepset/roberta-base-squad2"):
+    """Shared question-answering pipeline, kept on CPU to avoid CUDA errors"""
+    return get_model("question-answering", model_name, device=-1)
+
+def get_zero_shot_classifier(model_name="facebook/bart-large-mnli"):
+    """Shared zero-shot classification pipeline used for topics and bias"""
+    return get_model("zero-shot-classification", model_name)
+
+def get_wav2vec2(model_name="facebook/wav2vec2-base-960h"):
+    """Shared Wav2Vec2 (tokenizer, model) pair for speech recognition"""
+    def load():
+        from transformers import Wav2Vec2ForCTC, Wav2Vec2Tokenizer
+        return Wav2Vec2Tokenizer.from_pretrained(model_name), Wav2Vec2ForCTC.from_pretrained(model_name)
+    return get_model("wav2vec2", model_name, device=-1, loader=load)
+
+def get_whisper_model(size="base"):
+    """Shared Whisper model for the transcription fallback"""
+    def load():
+        import whisper
+        return whisper.load_model(size)
+    return get_model("whisper", size, loader=load)
+
+def get_caption_model(model_name="nlpconnect/vit-gpt2-image-captioning"):
+    """Shared (model, feature extractor, tokenizer) triple for video frame captioning"""
+    def load():
+        import torch
+        from transformers import VisionEncoderDecoderModel, ViTImageProcessor, AutoTokenizer
+        model = VisionEncoderDecoderModel.from_pretrained(model_name)
+        model.to(torch.device("cuda" if torch.cuda.is_available() else "cpu"))
+        return (
+            model,
+            ViTImageProcessor.from_pretrained(model_name),
+            AutoTokenizer.from_pretrained(model_name)
+        )
+    return get_model("image-captioning", model_name, loader=load)
+
+def get_embedding_model(model_name=None):
+    """Shared (tokenizer, model) pair of the sentence encoder used for topic classification"""
+    model_name = model_name or EMBEDDING_MODEL
+    def load():
+        from transformers import AutoModel, AutoTokenizer
+        model = AutoModel.from_pretrained(model_name)
+        model.eval()
+        return AutoTokenizer.from_pretrained(model_name), model
+    return get_model("embedding", model_name, device=-1, loader=load)
 
 # Preprocessing Functions
+_REPEATED_PUNCTUATION_RE = re.compile(r'([.,!?;:]){2,}')
+_WHITESPACE_RE = re.compile(r'\s+')
+_NON_ALPHANUMERIC_RE = re.compile(r'[^a-zA-Z0-9\s]')
+# Whole alphabetic words only: parts of contractions, hyphenated words and
+# alphanumeric tokens are not words of their own, as with the NLTK tokenizer
+_WORD_RE = re.compile(r"(?<![\w'’-])[^\W\d_]{3,}(?![\w'’-])")
+# Words the NLTK tokenizer splits into stopwords only ("can" + "not"), so they were dropped whole
+_SPLIT_STOPWORDS = frozenset({"cannot"})
+# Gaps left where a dropped word stood between a word and its punctuation
+_SPACE_BEFORE_PUNCTUATION_RE = re.compile(r' ([.,!?;:)\]}])')
+_SPACE_AFTER_BRACKET_RE = re.compile(r'([(\[{]) ')
+# Input characters per preprocessing process: about 0.1 s of work at ~5 MB/s, against roughly
+# 50 ms to start a pool, so corpora under two of these are preprocessed in this process
+PREPROCESS_CHARS_PER_WORKER = 512 * 1024
+_stopwords = None
+_stopwords_lock = threading.Lock()
+
+def get_stopwords():
+    """NLTK English stopwords as a frozenset, loaded once"""
+    global _stopwords
+    if _stopwords is None:
+        with _stopwords_lock:
+            if _stopwords is None:
+                from nltk.corpus import stopwords
+                _stopwords = frozenset(stopwords.words("english"))
+    return _stopwords
+
 def preprocess_text(text, preserve_case=True, keep_punctuation=True):
     """Enhanced preprocessing with options to preserve case and punctuation for better ROUGE scores"""
     # Initial cleaning
@@ -55,23 +529,173 @@ def preprocess_text(text, preserve_case=True, keep_punctuation=True):
     
     if keep_punctuation:
         # Only remove excessive punctuation and normalize spacing
-        text = re.sub(r'([.,!?;:]){2,}', r'\1', text)  # Replace multiple punctuation with single
-        text = re.sub(r'\s+', ' ', text).strip()  # Normalize spacing
+        text = _REPEATED_PUNCTUATION_RE.sub(r'\1', text)  # Replace multiple punctuation with single
     else:
         # Remove all punctuation
-        text = re.sub(r'[^a-zA-Z0-9\s]', '', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-    
-    # Tokenize and filter stopwords if needed
-    words = word_tokenize(text)
+        text = _NON_ALPHANUMERIC_RE.sub('', text)
     
     # Only filter stopwords for certain summarization approaches
     # Keeping stopwords often helps with ROUGE scores
-    filtered_words = [word for word in words if word.lower() not in stopwords.words("english") or len(word) <= 2 or not word.isalpha()]
+    # Words of up to two letters and non-alphabetic tokens are always kept, so only longer
+    # alphabetic words are matched and dropped in place, leaving punctuation attached
+    stop = get_stopwords()
+    
+    def drop_stopword(match):
+        word = match.group(0).lower()
+        return "" if word in stop or word in _SPLIT_STOPWORDS else match.group(0)
+    
+    text = _WORD_RE.sub(drop_stopword, text)
+    text = _WHITESPACE_RE.sub(' ', text).strip()
+    # "I go there ." and "( and snow)" become "I go." and "(snow)"
+    text = _SPACE_BEFORE_PUNCTUATION_RE.sub(r'\1', text)
+    return _SPACE_AFTER_BRACKET_RE.sub(r'\1', text)
+
+def preprocess_many(texts, workers=None, preserve_case=True, keep_punctuation=True):
+    """
+    Preprocess a corpus of documents, in parallel processes when it is worth it.
+
+    :param texts: Iterable of documents.
+    :param workers: Most worker processes to use; defaults to the number of CPUs. 1 runs in this process,
+                    and so does any corpus too small to give each worker PREPROCESS_CHARS_PER_WORKER characters.
+    :param preserve_case: Passed on to preprocess_text.
+    :param keep_punctuation: Passed on to preprocess_text.
+    :return: List of preprocessed documents in the order of the input.
+    """
+    import functools
+    texts = list(texts)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    total_chars = sum(len(text) for text in texts)
+    workers = max(1, min(workers, len(texts), total_chars // PREPROCESS_CHARS_PER_WORKER))
+    process = functools.partial(preprocess_text, preserve_case=preserve_case, keep_punctuation=keep_punctuation)
+    if workers == 1:
+        return [process(text) for text in texts]
     
-    return " ".join(filtered_words)
+    from concurrent.futures import ProcessPoolExecutor
+    # Hand each worker several documents at a time so short texts do not pay a round trip each
+    chunksize = max(1, len(texts) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(process, texts, chunksize=chunksize))
 
-def chunk_text(text, chunk_size=500, overlap=50, respect_sentences=True):
+_punkt_tokenizer = None
+
+def _get_punkt_tokenizer():
+    """English Punkt sentence tokenizer (the one behind nltk.sent_tokenize), loaded on first use"""
+    global _punkt_tokenizer
+    if _punkt_tokenizer is None:
+        try:
+            from nltk.tokenize import PunktTokenizer
+            _punkt_tokenizer = PunktTokenizer("english")
+        except ImportError:
+            # NLTK releases before 3.8.2 ship the pickled model instead
+            import nltk
+            _punkt_tokenizer = nltk.data.load("tokenizers/punkt/english.pickle")
+    return _punkt_tokenizer
+
+class SentenceIndex:
+    """
+    Sentence boundaries of a text, tokenized once and kept as character offsets.
+
+    Chunking, overlaps and "which sentence contains this position" lookups are all
+    answered from the offset arrays without re-tokenizing any part of the text.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.starts = array("q")
+        self.ends = array("q")
+        for start, end in _get_punkt_tokenizer().span_tokenize(text):
+            self.starts.append(start)
+            self.ends.append(end)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def sentence(self, i):
+        return self.text[self.starts[i]:self.ends[i]]
+
+    def sentences(self):
+        return [self.text[start:end] for start, end in zip(self.starts, self.ends)]
+
+    def span(self, first, last):
+        """Character span covering sentences first..last-1"""
+        return self.starts[first], self.ends[last - 1]
+
+    def slice(self, first, last):
+        """Index of sentences first..last-1 as a text of their own, without re-tokenizing"""
+        start, end = self.span(first, last)
+        sub_index = SentenceIndex.__new__(SentenceIndex)
+        sub_index.text = self.text[start:end]
+        sub_index.starts = array("q", (offset - start for offset in self.starts[first:last]))
+        sub_index.ends = array("q", (offset - start for offset in self.ends[first:last]))
+        return sub_index
+
+    def find(self, offset):
+        """Index of the sentence containing (or closest before) a character offset"""
+        return max(0, bisect.bisect_right(self.starts, offset) - 1)
+
+    def pack(self, sizes, budget, overlap=0, anchors=None, min_gap=0):
+        """
+        Group consecutive sentences into ranges whose total size stays within a budget.
+
+        :param sizes: Size of each sentence (characters, tokens, ...).
+        :param budget: Maximum total size of a range; a single larger sentence forms its own range.
+        :param overlap: Size of trailing sentences repeated at the start of the next range.
+        :param anchors: Optional flags marking sentences a range may end after. An anchor at least
+                        min_gap after the previous anchor is a cut point, and every range ends at the
+                        first cut point it reaches. Cut points depend only on the text around them,
+                        not on where the range started, so after an edit the ranges resynchronize at
+                        the next cut point. Ranges without one within the budget are cut at the budget.
+        :param min_gap: Size between consecutive anchors below which the later one is not a cut point.
+        :return: List of (first, last) sentence index ranges, last exclusive.
+        """
+        # Prefix sums turn every range size into a single subtraction
+        prefix = array("q", [0])
+        for size in sizes:
+            prefix.append(prefix[-1] + size)
+        
+        count = len(sizes)
+        cuts = None
+        if anchors is not None:
+            cuts = [False] * count
+            previous = 0
+            for i in range(count):
+                if anchors[i]:
+                    cuts[i] = prefix[i + 1] - previous >= min_gap
+                    previous = prefix[i + 1]
+        
+        ranges = []
+        first = 0
+        while first < count:
+            last = first + 1
+            while last < count and prefix[last + 1] - prefix[first] <= budget:
+                last += 1
+            if cuts is not None and last < count:
+                for end in range(first + 1, last):
+                    if cuts[end - 1]:
+                        last = end
+                        break
+            ranges.append((first, last))
+            if last == count:
+                break
+            
+            # Step back over the trailing sentences that fit in the overlap, always moving forward
+            # and leaving room for at least one new sentence in the next range
+            next_first = last
+            while (next_first - 1 > first
+                   and prefix[last] - prefix[next_first - 1] <= overlap
+                   and prefix[last + 1] - prefix[next_first - 1] <= budget):
+                next_first -= 1
+            first = next_first
+        return ranges
+
+    def chunk_spans(self, chunk_size=500, overlap=50):
+        """Character spans of sentence-aligned chunks of about chunk_size characters"""
+        # Each sentence also carries the separator that precedes the next one
+        sizes = [end - start + 1 for start, end in zip(self.starts, self.ends)]
+        return [self.span(first, last) for first, last in self.pack(sizes, chunk_size, overlap)]
+
+def chunk_text(text, chunk_size=500, overlap=50, respect_sentences=True, index=None):
     """Enhanced text chunking with overlap and sentence boundary respect for better coherence"""
     if not text:
         return []
@@ -83,175 +707,1319 @@ def chunk_text(text, chunk_size=500, overlap=50, respect_sentences=True):
             chunks.append(text[i:i + chunk_size])
         return chunks
     
-    # Sentence-aware chunking
-    sentences = sent_tokenize(text)
+    # Sentence-aware chunking from a single sentence tokenization
+    index = index or SentenceIndex(text)
+    return [text[start:end] for start, end in index.chunk_spans(chunk_size, overlap)]
+
+TOKEN_CHUNK_FRACTION = 0.9  # Share of the model context filled by a chunk, leaving room for prefixes
+CHUNK_ANCHOR_SPACING = 0.25  # Average distance between content-defined anchors, as a share of the budget
+CHUNK_ANCHOR_MIN_GAP = 0.4  # Distance from the previous anchor for an anchor to be a cut point, as a share of the budget
+
+def content_anchors(sentences, sizes, spacing):
+    """
+    Pick sentences that may end a chunk from their own text, independent of their position.
+
+    A sentence is an anchor with probability size / spacing, decided by a hash of its text,
+    so an edit only moves the boundaries next to it and later chunks come out unchanged.
+    """
+    anchors = []
+    for sentence, size in zip(sentences, sizes):
+        digest = hashlib.blake2b(sentence.encode("utf-8"), digest_size=8).digest()
+        anchors.append(int.from_bytes(digest, "big") < min(1.0, size / spacing) * 2 ** 64)
+    return anchors
+
+def token_budget(tokenizer, max_fraction=TOKEN_CHUNK_FRACTION):
+    """Tokens a chunk may hold for a model: a fraction of its context length"""
+    model_max_length = tokenizer.model_max_length
+    # Tokenizers without a configured limit report a huge sentinel value
+    if not model_max_length or model_max_length > 100000:
+        model_max_length = 512
+    return int(model_max_length * max_fraction)
+
+def chunk_text_by_tokens(text, tokenizer, max_fraction=TOKEN_CHUNK_FRACTION, max_tokens=None, overlap=0, index=None,
+                         content_defined=False):
+    """
+    Pack whole sentences into chunks that fit the model's context, measured in real tokens.
+
+    :param text: Text to split.
+    :param tokenizer: Tokenizer of the model the chunks are meant for.
+    :param max_fraction: Fraction of tokenizer.model_max_length a chunk may use.
+    :param max_tokens: Explicit token budget per chunk, overriding max_fraction.
+    :param overlap: Tokens of trailing sentences repeated at the start of the next chunk.
+    :param index: Optional SentenceIndex of text, to reuse an existing sentence split.
+    :param content_defined: End chunks at content-defined anchors (see content_anchors) so that
+                            editing a revised document leaves the chunks away from the edit unchanged.
+    :return: List of (chunk, token_count) tuples.
+    """
+    if not text:
+        return []
+    
+    if max_tokens is None:
+        max_tokens = token_budget(tokenizer, max_fraction)
+    special_tokens = tokenizer.num_special_tokens_to_add()
+    budget = max_tokens - special_tokens
+    
+    index = index or SentenceIndex(text)
+    sentences = index.sentences()
+    sentence_ids = tokenizer(sentences, add_special_tokens=False)["input_ids"] if sentences else []
+    sizes = [len(ids) for ids in sentence_ids]
+    anchors = content_anchors(sentences, sizes, budget * CHUNK_ANCHOR_SPACING) if content_defined else None
+    
     chunks = []
-    current_chunk = ""
-    
-    for sentence in sentences:
-        # If adding this sentence would exceed chunk size and we already have content
-        if len(current_chunk) + len(sentence) > chunk_size and current_chunk:
-            chunks.append(current_chunk.strip())
-            # Keep some overlap by including the last sentence in the next chunk
-            last_sentences = sent_tokenize(current_chunk)[-1] if sent_tokenize(current_chunk) else ""
-            current_chunk = last_sentences + " " + sentence if last_sentences else sentence
-        else:
-            current_chunk += " " + sentence if current_chunk else sentence
+    for first, last in index.pack(sizes, budget, overlap, anchors, budget * CHUNK_ANCHOR_MIN_GAP):
+        n_tokens = sum(sizes[first:last])
+        if n_tokens > budget:
+            # A single sentence longer than the budget is split on token boundaries
+            ids = sentence_ids[first]
+            for start in range(0, len(ids), budget):
+                piece = ids[start:start + budget]
+                chunks.append((tokenizer.decode(piece, skip_special_tokens=True).strip(), len(piece) + special_tokens))
+            continue
+        start, end = index.span(first, last)
+        # Report sizes including the special tokens the model adds
+        chunks.append((text[start:end], n_tokens + special_tokens))
     
-    # Add the last chunk if it's not empty
-    if current_chunk.strip():
-        chunks.append(current_chunk.strip())
-        
     return chunks
 
+# Extractive Ranking
+PREFILTER_TOKENS_PER_WORD = 8  # Source tokens kept by the extractive pre-filter per word of the target summary
+
+def rank_sentences(sentences, damping=0.85, max_iter=50, tol=1e-6):
+    """
+    TextRank centrality of each sentence over the TF-IDF cosine similarity graph.
+
+    The similarity matrix is never built: with L2-normalized TF-IDF rows X, multiplying by
+    X @ X.T is done as X @ (X.T @ v), which keeps every iteration linear in the text size.
+
+    :param sentences: List of sentence strings.
+    :return: NumPy array of scores, one per sentence, summing to 1.
+    """
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    
+    count = len(sentences)
+    if count == 0:
+        return np.zeros(0)
+    try:
+        matrix = TfidfVectorizer(stop_words="english").fit_transform(sentences)
+    except ValueError:
+        # Nothing but stopwords: no basis for ranking
+        return np.full(count, 1.0 / count)
+    
+    def similarity(v):
+        # Sentence similarities without self-loops (each non-empty row has norm 1)
+        return matrix @ (matrix.T @ v) - self_similarity * v
+    
+    self_similarity = np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()
+    degree = similarity(np.ones(count))
+    inverse_degree = np.divide(1.0, degree, out=np.zeros(count), where=degree > 0)
+    
+    scores = np.full(count, 1.0 / count)
+    for _ in range(max_iter):
+        updated = (1 - damping) / count + damping * similarity(scores * inverse_degree)
+        # Isolated sentences pass their score on uniformly
+        updated += damping * scores[degree <= 0].sum() / count
+        if np.abs(updated - scores).sum() < tol:
+            scores = updated
+            break
+        scores = updated
+    return scores
+
+def select_sentences(scores, sizes, budget):
+    """Indices of the highest scoring sentences whose sizes fit the budget, in document order"""
+    import numpy as np
+    
+    selected = []
+    used = 0
+    for i in np.argsort(-np.asarray(scores), kind="stable"):
+        if used + sizes[i] <= budget:
+            selected.append(int(i))
+            used += sizes[i]
+    return sorted(selected)
+
+def extractive_prefilter(text, tokenizer, max_words, tokens_per_word=PREFILTER_TOKENS_PER_WORD, index=None):
+    """
+    Keep only the most central sentences of a text, up to a token budget that scales with max_words.
+
+    :param text: Text to reduce.
+    :param tokenizer: Tokenizer of the abstractive model the result is meant for.
+    :param max_words: Target summary length the budget is derived from.
+    :param tokens_per_word: Source tokens kept per word of the target summary.
+    :param index: Optional SentenceIndex of text, to reuse an existing sentence split.
+    :return: (reduced_text, info) where info holds sentence and token counts before and after
+             and the achieved compression (kept tokens / original tokens).
+    """
+    index = index or SentenceIndex(text)
+    sentences = index.sentences()
+    sizes = [len(ids) for ids in tokenizer(sentences, add_special_tokens=False)["input_ids"]] if sentences else []
+    total_tokens = sum(sizes)
+    budget = max_words * tokens_per_word
+    
+    if total_tokens <= budget:
+        kept = list(range(len(sentences)))
+        reduced_text = text
+    else:
+        kept = select_sentences(rank_sentences(sentences), sizes, budget)
+        reduced_text = " ".join(sentences[i] for i in kept)
+    
+    kept_tokens = sum(sizes[i] for i in kept)
+    info = {
+        "sentences": len(sentences),
+        "kept_sentences": len(kept),
+        "tokens": total_tokens,
+        "kept_tokens": kept_tokens,
+        "compression": round(kept_tokens / total_tokens, 4) if total_tokens else 1.0
+    }
+    logging.info(f"Extractive pre-filter kept {kept_tokens} of {total_tokens} tokens ({info['compression']:.1%})")
+    return reduced_text, info
+
+def summarize_extractive(text, max_words, index=None):
+    """
+    Summarize by picking the most central sentences, without any transformer model.
+
+    :param text: Text to summarize.
+    :param max_words: Maximum words in the summary.
+    :param index: Optional SentenceIndex of text, to reuse an existing sentence split.
+    :return: The selected sentences in document order.
+    """
+    index = index or SentenceIndex(text)
+    sentences = index.sentences()
+    if not sentences:
+        return ""
+    
+    scores = rank_sentences(sentences)
+    selected = select_sentences(scores, [len(sentence.split()) for sentence in sentences], max_words)
+    if not selected:
+        # Even the shortest sentence is too long: cut the best one down to size
+        return _truncate_summary(sentences[int(scores.argmax())], max_words)
+    return " ".join(sentences[i] for i in selected)
+
 # Summarization Functions
-def summarize_text(text, model_choice, max_words=None, optimize_for_rouge=True):
-    """Enhanced summarization function with ROUGE optimization"""
+SUMMARY_BATCH_SIZE = int(os.environ.get("SUMMARIZER_BATCH_SIZE", "8"))
+
+def decoding_params(model_choice, optimize_for_rouge=True):
+    """Generation parameters used for a model choice"""
+    if model_choice == "t5-3b":
+        # Memory-efficient generation for t5-3b
+        return {
+            "do_sample": True,
+            "top_p": 0.92,       # Higher top_p for t5-3b to improve quality
+            "top_k": 50,
+            "num_beams": 2,      # Reduced beam size to save memory
+            "early_stopping": True,  # Stop early when possible to save computation
+            "no_repeat_ngram_size": 3  # Prevent repetition
+        }
+    if optimize_for_rouge:
+        return {
+            "do_sample": True,  # Enable sampling for diversity
+            "top_p": 0.85,      # Nucleus sampling for better quality
+            "top_k": 50,        # Limit vocabulary for more focused summaries
+            "num_beams": 4      # Beam search for better quality
+        }
+    return {"do_sample": False}
+
+def _summarize_batch(model, texts, max_length, min_length, **generate_kwargs):
+    """Run one batched pipeline call, retrying text by text if the batch fails"""
     try:
-        # Get the maximum word limit from user input if not provided
-        if max_words is None:
-            max_words = int(input("Enter maximum word limit for the summary (recommended: 20-30% of original length): "))
-            
-        # For t5-3b, warn about memory requirements and set smaller chunk size
-        if model_choice == "t5-3b":
-            logging.info("Using t5-3b model - this requires significant memory and may be slower")
-            # Reduce memory usage by processing smaller chunks for large models
-            chunk_size = 512  # Smaller chunks for t5-3b
-            overlap = 50
-        else:
-            chunk_size = 1000
-            overlap = 100
-        
-        # Calculate original text length for better proportional summarization
-        original_word_count = len(text.split())
+        outputs = model(texts, max_length=max_length, min_length=min_length, batch_size=len(texts), **generate_kwargs)
+        return [output['summary_text'] for output in outputs]
+    except Exception as e:
+        logging.error(f"Batched summarization error: {e}")
+    
+    # Retry one by one so a failing chunk does not take the whole batch down
+    summaries = []
+    for text in texts:
+        try:
+            output = model(text, max_length=max_length, min_length=min_length, **generate_kwargs)
+            summaries.append(output[0]['summary_text'])
+        except Exception as chunk_error:
+            logging.error(f"Summarization error on chunk: {chunk_error}")
+            summaries.append(None)
+    return summaries
+
+# Generation costs
+# Seconds per input token at the model's default beam count, used until real calls have been timed
+DEFAULT_TOKEN_COSTS = {
+    "t5-small": 0.0004,
+    "sshleifer/distilbart-cnn-12-6": 0.0015,
+    "facebook/bart-large-cnn": 0.003,
+    "google/pegasus-xsum": 0.004,
+    "t5-3b": 0.02
+}
+TOKENS_PER_WORD = 1.3  # Rough subword tokens per whitespace word, for estimates before tokenizing
+COST_SMOOTHING = 0.3  # Weight of the newest measurement in the running cost average
+_generation_costs = {}
+_generation_costs_lock = threading.Lock()
+
+def generation_cost_key(model, generate_kwargs):
+    """(model name, beam count) that a pipeline call's cost is tracked under"""
+    model_name = getattr(getattr(model, "model", None), "name_or_path", None)
+    if generate_kwargs.get("assistant_model") is not None:
+        model_name = f"{model_name}+assisted"
+    return model_name, generate_kwargs.get("num_beams")
+
+def record_generation_cost(key, tokens, seconds):
+    """Fold a timed generate call into the running seconds-per-token average for its key"""
+    if tokens <= 0:
+        return
+    cost = seconds / tokens
+    with _generation_costs_lock:
+        previous = _generation_costs.get(key)
+        _generation_costs[key] = cost if previous is None else (1 - COST_SMOOTHING) * previous + COST_SMOOTHING * cost
+
+def _beam_work(num_beams):
+    """Decoding work relative to greedy search; None stands for the model's default (usually 4 beams)"""
+    if num_beams is None:
+        return 3.0
+    return max(1.0, num_beams * 0.75)
+
+def estimate_generation_cost(key, tokens):
+    """
+    Expected seconds to summarize a number of input tokens.
+
+    Uses the measured cost for the key, else a measurement of the same model with another beam
+    count scaled by the decoding work, else DEFAULT_TOKEN_COSTS.
+    """
+    model_name, num_beams = key
+    with _generation_costs_lock:
+        cost = _generation_costs.get(key)
+        if cost is None:
+            for (measured_model, measured_beams), measured_cost in _generation_costs.items():
+                if measured_model == model_name:
+                    cost = measured_cost / _beam_work(measured_beams) * _beam_work(num_beams)
+                    break
+    if cost is None:
+        cost = DEFAULT_TOKEN_COSTS.get(model_name, 0.003) / _beam_work(None) * _beam_work(num_beams)
+    return cost * tokens
+
+def generation_costs():
+    """Measured seconds per input token for each (model name, beam count)"""
+    with _generation_costs_lock:
+        return {f"{model_name}/beams={num_beams}": cost for (model_name, num_beams), cost in _generation_costs.items()}
+
+def iter_summaries(model, chunks, lengths, batch_size=None, sizes=None, ordered=False, **generate_kwargs):
+    """
+    Summarize chunks in padded batches, yielding (index, summary) as each batch finishes.
+
+    Chunks are grouped by their length budget and sorted by size inside each group,
+    so every batch holds similarly sized inputs and pads as little as possible.
+
+    :param model: Summarization pipeline.
+    :param chunks: Texts to summarize.
+    :param lengths: (max_length, min_length) for each chunk.
+    :param batch_size: Chunks per generate call (defaults to SUMMARY_BATCH_SIZE).
+    :param sizes: Optional size of each chunk in tokens; character counts are used otherwise.
+    :param ordered: Yield in document order, sorting only within consecutive windows of batch_size chunks.
+    :return: Generator of (index, summary) pairs, with None where generation failed.
+    """
+    batch_size = batch_size or SUMMARY_BATCH_SIZE
+    # Generation costs are only learned when the sizes are real token counts
+    cost_key = generation_cost_key(model, generate_kwargs) if sizes else None
+    sizes = sizes or [len(chunk) for chunk in chunks]
+    
+    if ordered:
+        windows = [range(start, min(start + batch_size, len(chunks))) for start in range(0, len(chunks), batch_size)]
+    else:
+        windows = [range(len(chunks))]
+    
+    for window in windows:
+        groups = {}
+        for i in window:
+            groups.setdefault(lengths[i], []).append(i)
+        
+        window_summaries = {}
+        for (max_length, min_length), indices in groups.items():
+            indices.sort(key=lambda i: sizes[i])
+            for start in range(0, len(indices), batch_size):
+                batch = indices[start:start + batch_size]
+                started = time.perf_counter()
+                summaries = _summarize_batch(model, [chunks[i] for i in batch], max_length, min_length, **generate_kwargs)
+                if cost_key is not None:
+                    record_generation_cost(cost_key, sum(sizes[i] for i in batch), time.perf_counter() - started)
+                for i, summary in zip(batch, summaries):
+                    if ordered:
+                        window_summaries[i] = summary
+                    else:
+                        yield i, summary
         
-        # Adjust min_length and max_length based on original text length
-        # Ensure min_length is always less than max_length
-        max_length = min(max_words, int(original_word_count * 0.4))  # At most 40% of original
-        min_length = min(max(5, int(original_word_count * 0.05)), max_length - 1)  # At least 5% of original but less than max_length
+        for i in sorted(window_summaries):
+            yield i, window_summaries[i]
+
+def generate_summaries(model, chunks, lengths, batch_size=None, sizes=None, **generate_kwargs):
+    """
+    Summarize chunks in padded batches and return the summaries in input order.
+
+    Takes the same arguments as iter_summaries.
+
+    :return: List of summaries, with None where generation failed.
+    """
+    summaries = [None] * len(chunks)
+    for i, summary in iter_summaries(model, chunks, lengths, batch_size=batch_size, sizes=sizes, **generate_kwargs):
+        summaries[i] = summary
+    return summaries
+
+# Assisted decoding
+# Draft models that share their target's tokenizer: the draft proposes several tokens and the
+# target checks them in a single forward pass, keeping the target's greedy output exactly
+ASSISTANT_MODELS = {"bart-large": "distilbart"}
+ASSISTED_PARAMS = {"do_sample": False, "num_beams": 1}  # Assisted generation is greedy and unbatched
+
+def get_assistant_model(model_choice):
+    """Draft model used to speed up model_choice in assisted decoding, or None if it has none"""
+    draft_choice = ASSISTANT_MODELS.get(model_choice)
+    if draft_choice is None:
+        return None
+    return get_summarizer(draft_choice, backend="pytorch").model
+
+# Deadlines
+SMALLER_MODEL = {"t5-3b": "bart-large", "pegasus": "distilbart", "bart-large": "distilbart", "distilbart": "t5-small"}
+DEADLINE_SAFETY = 0.8  # Share of the time budget a strategy's estimate may use
+GREEDY_PARAMS = {"do_sample": False, "num_beams": 1}
+
+def _model_resident(model_name):
+    with _model_registry_lock:
+        return any(key[1] == model_name for key in _model_registry)
+
+def plan_summary(text, model_choice, max_words, deadline_ms, params, prefilter=False):
+    """
+    Pick the best summarization strategy expected to finish within a time budget.
+
+    Strategies are tried from the requested one down: greedy decoding, greedy decoding on the
+    extractive pre-filter's output, smaller models that are already loaded, and finally the
+    extractive summarizer. Estimates come from estimate_generation_cost, plus the load time
+    (see model_cost) when the requested model is not loaded yet, since the budget covers loading.
+
+    :return: Dict with the chosen "model_choice", "params" and "prefilter", the "estimate_ms"
+             and whether the plan is "degraded" from the requested strategy.
+    """
+    # The extractive summarizer is the cheapest strategy there is, not a degraded one
+    if model_choice == EXTRACTIVE_MODEL:
+        return {"model_choice": EXTRACTIVE_MODEL, "params": {}, "prefilter": False, "estimate_ms": 0, "degraded": False}
+    
+    tokens = int(len(text.split()) * TOKENS_PER_WORD)
+    prefilter_tokens = min(tokens, max_words * PREFILTER_TOKENS_PER_WORD)
+    candidates = [(model_choice, params, prefilter), (model_choice, GREEDY_PARAMS, prefilter), (model_choice, GREEDY_PARAMS, True)]
+    choice = model_choice
+    while choice in SMALLER_MODEL:
+        choice = SMALLER_MODEL[choice]
+        # Loading another model would eat the budget by itself
+        if _model_resident(models[choice]):
+            candidates.append((choice, GREEDY_PARAMS, True))
+    
+    budget = deadline_ms / 1000 * DEADLINE_SAFETY
+    # Unknown choices are summarized with bart-large-cnn, as in get_summarizer
+    model_name = models.get(model_choice) or "facebook/bart-large-cnn"
+    load_seconds = 0 if _model_resident(model_name) else model_cost(model_choice)[1]
+    for rank, (choice, choice_params, choice_prefilter) in enumerate(candidates):
+        key = (models.get(choice), choice_params.get("num_beams"))
+        estimate = estimate_generation_cost(key, prefilter_tokens if choice_prefilter else tokens)
+        if choice == model_choice:
+            estimate += load_seconds
+        if estimate <= budget:
+            return {"model_choice": choice, "params": choice_params, "prefilter": choice_prefilter,
+                    "estimate_ms": round(estimate * 1000), "degraded": rank > 0}
+    return {"model_choice": EXTRACTIVE_MODEL, "params": {}, "prefilter": False, "estimate_ms": 0, "degraded": True}
+
+def iter_summaries_until(deadline, model, chunks, lengths, batch_size=None, sizes=None, **generate_kwargs):
+    """
+    Like iter_summaries with ordered=True, but stop generating once the time runs out.
+
+    Before each window of batch_size chunks the remaining time is compared with the window's
+    estimated cost; when it does not fit, the remaining chunks are yielded as None.
+
+    :param deadline: time.monotonic() value to finish by, or None for no limit.
+    :return: Generator of (index, summary, timed_out) tuples in document order.
+    """
+    batch_size = batch_size or SUMMARY_BATCH_SIZE
+    token_sizes = sizes or [int(len(chunk.split()) * TOKENS_PER_WORD) for chunk in chunks]
+    key = generation_cost_key(model, generate_kwargs)
+    generated = iter_summaries(model, chunks, lengths, batch_size=batch_size, sizes=sizes, ordered=True, **generate_kwargs)
+    timed_out = False
+    for i in range(len(chunks)):
+        if deadline is not None and not timed_out and i % batch_size == 0:
+            window_cost = estimate_generation_cost(key, sum(token_sizes[i:i + batch_size]))
+            timed_out = time.monotonic() + window_cost > deadline
+            if timed_out:
+                logging.warning(f"Deadline reached, skipping generation for the last {len(chunks) - i} chunks")
+        if timed_out:
+            yield i, None, True
+        else:
+            _, summary = next(generated)
+            yield i, summary, False
+
+def iter_scheduled_until(deadline, scheduler, chunks, lengths, **generate_kwargs):
+    """
+    Like iter_summaries_until, but generate through a shared BatchScheduler.
+
+    All chunks are submitted at once so they can share generate calls with other requests.
+    When the deadline passes, chunks the scheduler has not started are cancelled and yielded
+    as timed out; summaries that finished in time are still yielded.
+
+    :return: Generator of (index, summary, timed_out) tuples in document order.
+    """
+    futures = [scheduler.submit(chunk, max_length, min_length, **generate_kwargs)
+               for chunk, (max_length, min_length) in zip(chunks, lengths)]
+    timed_out = False
+    for i, future in enumerate(futures):
+        if timed_out:
+            # Batches that finished in time are still used, the rest is no longer waited for
+            finished = future.done() and not future.cancelled()
+            yield i, future.result() if finished and future.exception() is None else None, not finished
+            continue
+        remaining = None if deadline is None else max(0, deadline - time.monotonic())
+        try:
+            yield i, future.result(timeout=remaining), False
+        except FutureTimeoutError:
+            timed_out = True
+            # Chunks the scheduler has not started are dropped, so they do not hold up other requests
+            for pending in futures[i:]:
+                pending.cancel()
+            logging.warning(f"Deadline reached, skipping generation for the last {len(chunks) - i} chunks")
+            yield i, None, True
+        except Exception as e:
+            logging.error(f"Summarization error: {e}")
+            yield i, None, False
+
+# Automatic model routing
+AUTO_MODEL = "auto"
+# Models the router may pick, best summaries first (pegasus-xsum writes single-sentence summaries)
+AUTO_CANDIDATES = ["t5-3b", "bart-large", "distilbart", "t5-small"]
+# Smallest inputs (in tokens) worth a model's memory: t5-3b only pays off on multi-chunk documents
+AUTO_MIN_TOKENS = {"t5-3b": 1024}
+# Seconds a summary may take in each latency tier
+LATENCY_TIERS = {"interactive": 3, "standard": 20, "batch": 300}
+DEFAULT_LOAD_SECONDS = {"t5-small": 2, "distilbart": 8, "bart-large": 12, "pegasus": 15, "t5-3b": 90}
+COST_TABLE_PATH = os.environ.get("SUMMARIZER_COST_TABLE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_costs.json"))
+_cost_table = None
+
+def load_cost_table(path=None):
+    """Read the per-model costs written by `benchmark.py calibrate`, empty if it has not been run"""
+    global _cost_table
+    try:
+        with open(path or COST_TABLE_PATH, "r", encoding="utf-8") as f:
+            _cost_table = json.load(f).get("models", {})
+    except (OSError, ValueError) as e:
+        logging.info(f"No model cost table loaded ({e}), routing with default costs")
+        _cost_table = {}
+    return _cost_table
+
+def model_cost(model_choice):
+    """(seconds per input token, load seconds) for a model choice, calibrated where available"""
+    if _cost_table is None:
+        load_cost_table()
+    calibrated = _cost_table.get(model_choice, {})
+    seconds_per_token = calibrated.get("seconds_per_token", DEFAULT_TOKEN_COSTS.get(models.get(model_choice), 0.003))
+    load_seconds = calibrated.get("load_seconds", DEFAULT_LOAD_SECONDS.get(model_choice, 10))
+    return seconds_per_token, load_seconds
+
+def route_model(text, max_words, latency_tier="standard"):
+    """
+    Pick the model for model_choice="auto" from the input size, target length and latency tier.
+
+    The best model in AUTO_CANDIDATES that the input is large enough for (AUTO_MIN_TOKENS) and whose
+    estimated time (input tokens times its cost, plus its load time when it is not resident) fits
+    the tier's budget is chosen, falling back to the extractive summarizer; inputs no longer than
+    the summary itself go straight to it.
+
+    :param latency_tier: Key of LATENCY_TIERS.
+    :return: The chosen model choice.
+    """
+    if latency_tier not in LATENCY_TIERS:
+        raise ValueError(f"Unknown latency tier {latency_tier!r}, expected one of {', '.join(LATENCY_TIERS)}")
+    budget = LATENCY_TIERS[latency_tier]
+    tokens = int(len(text.split()) * TOKENS_PER_WORD)
+    
+    choice = EXTRACTIVE_MODEL
+    if tokens > max_words * TOKENS_PER_WORD:
+        for candidate in AUTO_CANDIDATES:
+            if tokens < AUTO_MIN_TOKENS.get(candidate, 0):
+                continue
+            seconds_per_token, load_seconds = model_cost(candidate)
+            estimate = tokens * seconds_per_token
+            if not _model_resident(models[candidate]):
+                estimate += load_seconds
+            if estimate <= budget:
+                choice = candidate
+                break
+    logging.info(f"Routed {tokens} tokens (max_words={max_words}, tier={latency_tier}) to {choice}")
+    return choice
+
+# Cross-request micro-batching
+BATCH_WINDOW_MS = float(os.environ.get("SUMMARIZER_BATCH_WINDOW_MS", "20"))
+_batch_schedulers = {}
+_batch_schedulers_lock = threading.Lock()
+
+class BatchScheduler:
+    """
+    Background scheduler that lets concurrent requests share generate calls.
+
+    Chunks submitted from any thread are collected for a short window, bucketed by
+    generation settings and token length, and summarized together; each caller gets
+    its summary back through a future as soon as its batch finishes. Every pass takes
+    at most max_batch_size chunks, one per submitting thread in turn, so a long document
+    does not hold back requests that arrive after it. Cancelled futures are skipped.
+    """
+
+    def __init__(self, model_choice, window_ms=None, max_batch_size=None):
+        self.model_choice = model_choice
+        self.window = (BATCH_WINDOW_MS if window_ms is None else window_ms) / 1000
+        self.max_batch_size = max_batch_size or SUMMARY_BATCH_SIZE
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"batcher-{model_choice}", daemon=True)
+        self._thread.start()
+
+    def submit(self, chunk, max_length, min_length, **generate_kwargs):
+        """Queue one chunk; the returned future resolves to its summary (None if generation failed)"""
+        future = Future()
+        self._queue.put((threading.get_ident(), (chunk, (max_length, min_length), generate_kwargs, future)))
+        return future
+
+    def summarize(self, chunks, lengths, **generate_kwargs):
+        """Submit a request's chunks and wait for all of their summaries"""
+        futures = [self.submit(chunk, max_length, min_length, **generate_kwargs)
+                   for chunk, (max_length, min_length) in zip(chunks, lengths)]
+        return [future.result() for future in futures]
+
+    def _run(self):
+        backlog = OrderedDict()  # Submitting thread -> its chunks not yet processed
+        while True:
+            if not backlog:
+                self._enqueue(backlog, self._queue.get())
+                # Keep collecting until the window after the first arrival closes
+                window_end = time.monotonic() + self.window
+                while True:
+                    remaining = window_end - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        self._enqueue(backlog, self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+            # Chunks that arrived during the last pass join without waiting for a window
+            while True:
+                try:
+                    self._enqueue(backlog, self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._process(self._take(backlog))
+
+    @staticmethod
+    def _enqueue(backlog, entry):
+        submitter, item = entry
+        backlog.setdefault(submitter, deque()).append(item)
+
+    def _take(self, backlog):
+        """Up to max_batch_size chunks, one from each submitting thread in turn"""
+        pending = []
+        while backlog and len(pending) < self.max_batch_size:
+            submitter, items = next(iter(backlog.items()))
+            item = items.popleft()
+            if items:
+                backlog.move_to_end(submitter)
+            else:
+                del backlog[submitter]
+            # Requests cancel the chunks they stopped waiting for, e.g. past their deadline
+            if item[3].set_running_or_notify_cancel():
+                pending.append(item)
+        return pending
+
+    def _process(self, pending):
+        if not pending:
+            return
+        try:
+            model = get_summarizer(self.model_choice)
+            # Only chunks with identical generation settings can share a generate call
+            groups = {}
+            for item in pending:
+                key = tuple(sorted(item[2].items()))
+                groups.setdefault(key, []).append(item)
+            
+            for items in groups.values():
+                chunks = [item[0] for item in items]
+                sizes = [len(ids) for ids in model.tokenizer(chunks)["input_ids"]]
+                summaries = iter_summaries(
+                    model,
+                    chunks,
+                    [item[1] for item in items],
+                    batch_size=self.max_batch_size,
+                    sizes=sizes,
+                    **items[0][2]
+                )
+                # Each caller gets its summary as soon as its batch is done
+                for i, summary in summaries:
+                    items[i][3].set_result(summary)
+        except Exception as e:
+            logging.error(f"Batch scheduler error ({self.model_choice}): {e}")
+            for item in pending:
+                if not item[3].done():
+                    item[3].set_exception(e)
+
+def get_batch_scheduler(model_choice):
+    """Shared batch scheduler for a model choice, started on first use"""
+    with _batch_schedulers_lock:
+        scheduler = _batch_schedulers.get(model_choice)
+        if scheduler is None:
+            scheduler = _batch_schedulers[model_choice] = BatchScheduler(model_choice)
+        return scheduler
+
+# Hierarchical (map-reduce) summarization
+HIERARCHY_SUMMARY_TOKENS = 128  # Upper bound for each intermediate chunk summary
+HIERARCHY_BLOCK_SENTENCES = 2000  # Sentences tokenized together when streaming the input
+HIERARCHY_MAX_LEVELS = 8
+
+def _batched(iterable, size):
+    """Yield lists of up to size items from an iterable"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def _iter_document_chunks(text, tokenizer, max_tokens):
+    """Stream token-sized chunks of a long text, tokenizing its sentences block by block"""
+    index = SentenceIndex(text)
+    for first in range(0, len(index), HIERARCHY_BLOCK_SENTENCES):
+        block = index.slice(first, min(first + HIERARCHY_BLOCK_SENTENCES, len(index)))
+        yield from chunk_text_by_tokens(block.text, tokenizer, max_tokens=max_tokens, index=block)
+
+def _truncate_summary(summary, max_words):
+    """Cut a summary to max_words, ending it with proper punctuation"""
+    words = summary.split()
+    if len(words) > max_words:
+        summary = " ".join(words[:max_words])
+        if not summary.endswith(('.', '!', '?')):
+            summary += '.'
+    return summary
+
+def summarize_hierarchical(text, model_choice, max_words, optimize_for_rouge=True, batch_size=None):
+    """
+    Summarize a very long document level by level until the result fits the target length.
+
+    Chunks are summarized in batches, their summaries are packed into new chunks and the
+    process repeats. The input is streamed block by block and only the packed input of the
+    next level is kept, so memory stays bounded by a fraction of the document size.
+
+    :param text: Document to summarize.
+    :param model_choice: Key of the models dict.
+    :param max_words: Maximum words in the final summary.
+    :param optimize_for_rouge: Use the ROUGE-oriented decoding parameters.
+    :param batch_size: Chunks per generate call (defaults to SUMMARY_BATCH_SIZE).
+    :return: Summary text.
+    """
+    model = get_summarizer(model_choice)
+    tokenizer = model.tokenizer
+    generate_kwargs = decoding_params(model_choice, optimize_for_rouge)
+    batch_size = batch_size or SUMMARY_BATCH_SIZE
+    max_tokens = token_budget(tokenizer)
+    special_tokens = tokenizer.num_special_tokens_to_add()
+    
+    chunks = _iter_document_chunks(text, tokenizer, max_tokens)
+    level = 0
+    while True:
+        head = list(itertools.islice(chunks, 2))
+        if len(head) < 2 or level >= HIERARCHY_MAX_LEVELS:
+            # Everything left fits in one chunk (or the level limit was hit): final reduction
+            remaining = head + list(chunks)
+            final_input = " ".join(chunk for chunk, _ in remaining)
+            break
         
-        # Initialize the summarization model
-        model_name = models.get(model_choice, "facebook/bart-large-cnn")
+        level += 1
+        input_count = 0
+        packed = []
+        current, current_tokens = [], 0
+        # Each level is processed in groups of several batches, so only one group is in flight
+        for group in _batched(itertools.chain(head, chunks), batch_size * 4):
+            input_count += len(group)
+            lengths = []
+            for _, n_tokens in group:
+                chunk_max_length = max(16, min(HIERARCHY_SUMMARY_TOKENS, n_tokens // 2))
+                lengths.append((chunk_max_length, chunk_max_length // 4))
+            summaries = generate_summaries(
+                model,
+                [chunk for chunk, _ in group],
+                lengths,
+                batch_size=batch_size,
+                sizes=[n_tokens for _, n_tokens in group],
+                **generate_kwargs
+            )
+            summaries = [
+                summary.strip() if summary is not None else " ".join(chunk.split()[:chunk_max_length])
+                for (chunk, _), summary, (chunk_max_length, _) in zip(group, summaries, lengths)
+            ]
+            
+            # Pack the summaries into the next level's chunks as they arrive
+            summary_sizes = [len(ids) for ids in tokenizer(summaries, add_special_tokens=False)["input_ids"]]
+            for summary, size in zip(summaries, summary_sizes):
+                if current and current_tokens + size > max_tokens - special_tokens:
+                    packed.append((" ".join(current), current_tokens + special_tokens))
+                    current, current_tokens = [], 0
+                current.append(summary)
+                current_tokens += size
+        if current:
+            packed.append((" ".join(current), current_tokens + special_tokens))
+        
+        logging.info(f"Hierarchical summarization level {level}: {input_count} chunks reduced to {len(packed)}")
+        if len(packed) >= input_count:
+            # No further reduction is possible; finish from what we have
+            final_input = " ".join(chunk for chunk, _ in packed)
+            break
+        chunks = iter(packed)
+    
+    # Final reduction to the requested length
+    max_length = max(10, max_words)
+    final_summary = generate_summaries(
+        model,
+        [final_input],
+        [(max_length, max_length // 2)],
+        truncation=True,  # Only reached by inputs left over when reduction stalls
+        **generate_kwargs
+    )[0]
+    if final_summary is None:
+        final_summary = final_input
+    
+    return _truncate_summary(_clean_chunk_summary(final_summary), max_words)
+
+# Summary Cache
+# Summaries are stored under a hash of everything that determines them: the input text,
+# model, length and decoding settings, and the version of this module's code.
+SUMMARY_CACHE_DIR = os.environ.get("SUMMARIZER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "text_summariser"))
+SUMMARY_CACHE_MAX_MB = float(os.environ.get("SUMMARIZER_CACHE_MAX_MB", "512"))
+SUMMARY_CACHE_MAX_AGE_DAYS = float(os.environ.get("SUMMARIZER_CACHE_MAX_AGE_DAYS", "30"))
+SUMMARY_CACHE_MEMORY_ITEMS = int(os.environ.get("SUMMARIZER_CACHE_MEMORY_ITEMS", "512"))
+_code_version = None
+
+def code_version():
+    """Hash of this module's source, so cached results are dropped whenever the code changes"""
+    global _code_version
+    if _code_version is None:
+        with open(os.path.abspath(__file__), "rb") as f:
+            _code_version = hashlib.sha256(f.read()).hexdigest()[:16]
+    return _code_version
+
+class SummaryCache:
+    """
+    Content-addressed cache with an in-memory LRU tier in front of a directory of JSON files.
+
+    Entries unused for longer than max_age are dropped, and the least recently used files
+    are deleted once the directory grows beyond max_bytes.
+    """
+
+    def __init__(self, directory=None, max_bytes=None, max_age=None, memory_items=None):
+        self.directory = directory or SUMMARY_CACHE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else SUMMARY_CACHE_MAX_MB * 1024 * 1024
+        self.max_age = max_age if max_age is not None else SUMMARY_CACHE_MAX_AGE_DAYS * 24 * 3600
+        self.memory_items = memory_items if memory_items is not None else SUMMARY_CACHE_MEMORY_ITEMS
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None  # Measured on the first write
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, *parts):
+        """Hash of the code version and the given JSON-serializable parts"""
+        payload = json.dumps([code_version(), *parts], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def _remember(self, key, value):
+        """Store in the memory tier. Caller holds the lock."""
+        self._memory[key] = (value, time.time())
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Cached value for a key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, last_used = entry
+                if now - last_used <= self.max_age:
+                    self._remember(key, value)
+                    self.hits += 1
+                    self.memory_hits += 1
+                else:
+                    del self._memory[key]
+                    entry = None
         
-        # Special handling for large models like t5-3b
-        if model_choice == "t5-3b":
+        path = self._path(key)
+        if entry is not None:
+            # Keep the disk entry recently used too, or age and size eviction would drop hot summaries
             try:
-                from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
-                # Load with device_map="auto" for large models to distribute across available devices
-                tokenizer = AutoTokenizer.from_pretrained(model_name)
-                
-                # Try to load with optimal settings first
-                try:
-                    t5_model = AutoModelForSeq2SeqLM.from_pretrained(
-                        model_name,
-                        device_map="auto",  # Automatically distribute model across available devices
-                        torch_dtype=torch.float16,  # Use half precision to reduce memory usage
-                        low_cpu_mem_usage=True
-                    )
-                except Exception as e:
-                    logging.warning(f"Could not load t5-3b with optimal settings: {e}. Trying with reduced settings.")
-                    # Fallback to more conservative settings
-                    t5_model = AutoModelForSeq2SeqLM.from_pretrained(
-                        model_name,
-                        torch_dtype=torch.float16,
-                        low_cpu_mem_usage=True
-                    )
-                
-                # Use gradient checkpointing to reduce memory usage during forward pass
-                t5_model.gradient_checkpointing_enable()
-                
-                model = pipeline("summarization", model=t5_model, tokenizer=tokenizer, framework="pt")
-                logging.info("Successfully loaded t5-3b model")
-            except Exception as e:
-                logging.error(f"Failed to load t5-3b model: {e}. Falling back to bart-large-cnn.")
-                # Fallback to a smaller model
-                model_name = "facebook/bart-large-cnn"
-                model = pipeline("summarization", model=model_name, tokenizer=model_name, framework="pt", device=0 if torch.cuda.is_available() else -1)
-        else:
-            # Standard pipeline for smaller models
-            model = pipeline("summarization", model=model_name, tokenizer=model_name, framework="pt", device=0 if torch.cuda.is_available() else -1)
+                os.utime(path)
+            except OSError:
+                pass
+            return value
         
-        # Use enhanced text chunking with overlap and sentence boundaries
-        text_chunks = chunk_text(text, chunk_size=chunk_size, overlap=overlap, respect_sentences=True)
+        try:
+            if now - os.path.getmtime(path) > self.max_age:
+                self._remove(path)
+                raise FileNotFoundError(path)
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)["value"]
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        
+        with self._lock:
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def set(self, key, value):
+        """Store a JSON-serializable value in both tiers"""
+        with self._lock:
+            self._remember(key, value)
         
-        # Process each chunk with optimized parameters
-        summaries = []
-        for i, chunk in enumerate(text_chunks):
-            try:
-                # Adjust parameters based on chunk position for better coherence
-                chunk_min_length = min_length if len(text_chunks) == 1 else max(5, min_length // len(text_chunks))
-                chunk_max_length = max_length if len(text_chunks) == 1 else max_length // len(text_chunks) + 10
-                
-                # Use different parameters for ROUGE optimization if requested
-                if model_choice == "t5-3b":
-                    # Memory-efficient generation for t5-3b
-                    summary_output = model(
-                        chunk, 
-                        max_length=chunk_max_length,
-                        min_length=chunk_min_length,
-                        do_sample=True,
-                        top_p=0.92,       # Higher top_p for t5-3b to improve quality
-                        top_k=50,
-                        num_beams=2,      # Reduced beam size to save memory
-                        early_stopping=True,  # Stop early when possible to save computation
-                        no_repeat_ngram_size=3  # Prevent repetition
-                    )
-                elif optimize_for_rouge:
-                    summary_output = model(
-                        chunk, 
-                        max_length=chunk_max_length,
-                        min_length=chunk_min_length,
-                        do_sample=True,  # Enable sampling for diversity
-                        top_p=0.85,      # Nucleus sampling for better quality
-                        top_k=50,        # Limit vocabulary for more focused summaries
-                        num_beams=4      # Beam search for better quality
-                    )
-                else:
-                    summary_output = model(
-                        chunk, 
-                        max_length=chunk_max_length,
-                        min_length=chunk_min_length,
-                        do_sample=False
-                    )
-                
-                summaries.append(summary_output[0]['summary_text'])
-            except Exception as e:
-                logging.error(f"Summarization error on chunk {i}: {e}")
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"value": value}, f)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            logging.warning(f"Could not write summary cache entry: {e}")
+            return
+        
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan()[1]
+            else:
+                self._disk_bytes += size
+            if self._disk_bytes > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        """List (mtime, size, path) of every entry on disk and their total size"""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        entries.append((os.path.getmtime(path), os.path.getsize(path), path))
+                    except OSError:
+                        pass
+        return entries, sum(size for _, size, _ in entries)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop expired files, then the least recently used ones until below 90% of the size limit. Caller holds the lock."""
+        entries, total = self._scan()
+        now = time.time()
+        for last_used, size, path in sorted(entries):
+            if now - last_used <= self.max_age and total <= self.max_bytes * 0.9:
+                break
+            self._remove(path)
+            total -= size
+        self._disk_bytes = total
+
+    def clear(self):
+        """Remove every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            for _, _, path in self._scan()[0]:
+                self._remove(path)
+            self._disk_bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes
+            }
+
+_summary_cache = None
+_summary_cache_lock = threading.Lock()
+
+def get_summary_cache():
+    """Process-wide summary cache shared by the CLI and the web app"""
+    global _summary_cache
+    with _summary_cache_lock:
+        if _summary_cache is None:
+            _summary_cache = SummaryCache()
+        return _summary_cache
+
+def _clean_chunk_summary(summary):
+    """Strip a chunk summary and make sure it ends with proper punctuation"""
+    clean_summary = summary.strip()
+    if clean_summary and clean_summary[-1] not in '.!?':
+        clean_summary += '.'
+    return clean_summary
+
+SUMMARY_LENGTH_STEP = 16  # Shares of max_words per chunk are rounded down to this many tokens
+
+def chunk_length_budget(chunk_words, chunk_count, max_words):
+    """
+    (max_length, min_length) of the summary of one chunk of chunk_words words, out of chunk_count chunks.
+
+    The budget depends on the chunk's own length and on max_words spread over the chunks, rounded down
+    to SUMMARY_LENGTH_STEP. An edit elsewhere in the document changes it (and so every chunk's cache key)
+    only when it changes the chunk count enough to move that share to another step; from
+    max_words / (2 * SUMMARY_LENGTH_STEP) chunks on the share stays at its floor of one step.
+    """
+    # Ensure min_length is always less than max_length
+    if chunk_count <= 1:
+        max_length = min(max_words, int(chunk_words * 0.4))  # At most 40% of original
+        min_length = min(max(5, int(chunk_words * 0.05)), max_length - 1)  # At least 5% of original but less than max_length
+        return max_length, min_length
+    
+    # Adjust parameters based on the number of chunks for better coherence
+    share = max(SUMMARY_LENGTH_STEP, max_words // chunk_count // SUMMARY_LENGTH_STEP * SUMMARY_LENGTH_STEP)
+    max_length = min(share, int(chunk_words * 0.4)) + 10
+    min_length = min(max(5, int(chunk_words * 0.05)), max_length - 1)
+    return max_length, min_length
+
+def _join_chunk_summaries(summaries):
+    """Join chunk summaries with proper spacing and connectors for better flow"""
+    if len(summaries) <= 1:
+        return summaries[0] if summaries else ""
+    
+    # Add transition phrases between chunks for better coherence
+    transitions = ["", "Furthermore, ", "Additionally, ", "Moreover, ", "In addition, "]
+    final_summary = summaries[0]
+    for i, summary in enumerate(summaries[1:], 1):
+        transition = transitions[min(i, len(transitions)-1)]
+        final_summary += " " + transition + summary
+    return final_summary
+
+def summarize_text_stream(text, model_choice, max_words, optimize_for_rouge=True, batch_size=None, use_cache=True,
+                          prefilter=False, deadline_ms=None, assisted=False, latency_tier="standard", params=None,
+                          chunk_lengths=None, micro_batching=False, polish=True):
+    """
+    Summarize text like summarize_text, yielding each chunk summary as soon as it is generated.
+
+    :param text: Text to summarize.
+    :param model_choice: Key of the models dict, or "auto" to let route_model pick one.
+    :param max_words: Maximum words in the final summary.
+    :param optimize_for_rouge: Use the ROUGE-oriented decoding parameters.
+    :param batch_size: Chunks per generate call (defaults to SUMMARY_BATCH_SIZE).
+    :param use_cache: Reuse chunk summaries from the summary cache, so a revised document
+                      only sends its new or changed chunks through the model.
+    :param prefilter: Pass only the most central sentences to the model (see extractive_prefilter).
+    :param deadline_ms: Time budget in milliseconds. A strategy expected to fit is chosen up front
+                        (see plan_summary) and chunks still pending when time runs out are summarized
+                        extractively; either way the result is flagged as degraded.
+    :param assisted: Decode greedily with the draft model in ASSISTANT_MODELS proposing tokens,
+                     for the target model's greedy output with fewer of its decoder steps.
+    :param latency_tier: Key of LATENCY_TIERS the automatic router picks a model for.
+    :param params: Generation parameters to decode with instead of decoding_params(model_choice, optimize_for_rouge).
+    :param chunk_lengths: (max_length, min_length) for every chunk instead of chunk_length_budget's share.
+    :param micro_batching: Generate through the model's shared BatchScheduler, together with the
+                           chunks of other in-flight requests (ignored for assisted decoding).
+    :param polish: End every chunk summary with punctuation, join them with transition phrases and
+                   cut the summary at a sentence end. False joins the model's summaries with spaces,
+                   uses the whole chunk where generation failed and cuts at max_words, as the web app does.
+    :return: Generator of event dicts: {"event": "model", "model_choice"} when the router picked the model,
+             {"event": "plan", ...} when a deadline is given, {"event": "prefilter", ...compression info}
+             when prefiltering, {"event": "chunks", "total"} once (with "cached": True and a total of 0 when
+             the whole summary came from the cache), then {"event": "chunk", "index", "total", "summary"}
+             per chunk in document order, and finally {"event": "summary", "summary", "degraded"}.
+    """
+    if model_choice == AUTO_MODEL:
+        model_choice = route_model(text, max_words, latency_tier)
+        yield {"event": "model", "model_choice": model_choice}
+    
+    if params is None:
+        params = decoding_params(model_choice, optimize_for_rouge)
+    
+    # Identical requests are answered from the cache without loading the model; assisted decoding
+    # reproduces greedy output, so it shares summaries with it whenever a draft model exists
+    cache = get_summary_cache() if use_cache else None
+    if cache is not None:
+        used_params = ASSISTED_PARAMS if assisted and model_choice in ASSISTANT_MODELS else params
+        summary_key = cache.key("summary", text, model_choice, max_words, prefilter, used_params, chunk_lengths, polish)
+        cached_summary = cache.get(summary_key)
+        if cached_summary is not None:
+            yield {"event": "chunks", "total": 0, "cached": True}
+            yield {"event": "summary", "summary": cached_summary, "degraded": False}
+            return
+    
+    deadline = None
+    degraded = False
+    if deadline_ms:
+        # Generation gets the same share of the budget as the plan, the rest is left for fallbacks
+        deadline = time.monotonic() + deadline_ms / 1000 * DEADLINE_SAFETY
+        plan = plan_summary(text, model_choice, max_words, deadline_ms, params, prefilter)
+        if plan["degraded"]:
+            logging.warning(f"Degrading {model_choice} to {plan} to meet a {deadline_ms} ms deadline")
+        model_choice, params, prefilter, degraded = plan["model_choice"], plan["params"], plan["prefilter"], plan["degraded"]
+        yield {"event": "plan", **plan}
+    
+    # The extractive summarizer handles the whole text at once on CPU
+    if model_choice == EXTRACTIVE_MODEL:
+        summary = summarize_extractive(text, max_words)
+        yield {"event": "chunks", "total": 1}
+        yield {"event": "chunk", "index": 0, "total": 1, "summary": summary}
+        # Degraded results must not be served later to requests with time to spare
+        if cache is not None and not degraded:
+            cache.set(summary_key, summary)
+        yield {"event": "summary", "summary": summary, "degraded": degraded}
+        return
+    
+    # For t5-3b, warn about memory requirements
+    if model_choice == "t5-3b":
+        logging.info("Using t5-3b model - this requires significant memory and may be slower")
+    
+    # Get the shared summarization model (assisted generation needs PyTorch models on both sides)
+    model = get_summarizer(model_choice, backend="pytorch" if assisted else None)
+    
+    generate_kwargs = params
+    if assisted:
+        assistant_model = get_assistant_model(model_choice)
+        if assistant_model is None:
+            logging.warning(f"No draft model for {model_choice}, decoding without assistance")
+        else:
+            # Assisted greedy output equals plain greedy output, so both share cached chunk summaries
+            params = ASSISTED_PARAMS
+            generate_kwargs = {**params, "assistant_model": assistant_model}
+            batch_size = 1
+    
+    # Long inputs are reduced to their most central sentences before generation
+    if prefilter:
+        text, info = extractive_prefilter(text, model.tokenizer, max_words)
+        yield {"event": "prefilter", **info}
+    
+    # Pack whole sentences into chunks sized to the model's real token context; with the chunk cache,
+    # boundaries are content-defined so unchanged parts of a revised document chunk identically
+    token_chunks = chunk_text_by_tokens(text, model.tokenizer, content_defined=cache is not None)
+    text_chunks = [chunk for chunk, _ in token_chunks]
+    chunk_sizes = [n_tokens for _, n_tokens in token_chunks]
+    logging.info(f"Split text into {len(text_chunks)} chunks of {chunk_sizes} tokens")
+    yield {"event": "chunks", "total": len(text_chunks)}
+    
+    if chunk_lengths is None:
+        chunk_lengths = [chunk_length_budget(len(chunk.split()), len(text_chunks), max_words) for chunk in text_chunks]
+    else:
+        chunk_lengths = [tuple(chunk_lengths)] * len(text_chunks)
+    
+    # Look up chunks summarized before with the same model and length budget
+    if cache is not None:
+        chunk_keys = [cache.key("chunk", chunk, model_choice, *lengths, params)
+                      for chunk, lengths in zip(text_chunks, chunk_lengths)]
+        cached_summaries = [cache.get(key) for key in chunk_keys]
+    else:
+        cached_summaries = [None] * len(text_chunks)
+    missing = [i for i, summary in enumerate(cached_summaries) if summary is None]
+    if cache is not None:
+        logging.info(f"Reusing {len(text_chunks) - len(missing)} of {len(text_chunks)} chunk summaries from the cache")
+    
+    # Summarize the remaining chunks in padded batches with optimized parameters, in document order
+    if micro_batching and not assisted:
+        # Batched together with the chunks of other in-flight requests
+        generated = iter_scheduled_until(
+            deadline,
+            get_batch_scheduler(model_choice),
+            [text_chunks[i] for i in missing],
+            [chunk_lengths[i] for i in missing],
+            **generate_kwargs
+        )
+    else:
+        generated = iter_summaries_until(
+            deadline,
+            model,
+            [text_chunks[i] for i in missing],
+            [chunk_lengths[i] for i in missing],
+            batch_size=batch_size,
+            sizes=[chunk_sizes[i] for i in missing],
+            **generate_kwargs
+        )
+    processed_summaries = []
+    for i, summary in enumerate(cached_summaries):
+        if summary is None:
+            _, summary, timed_out = next(generated)
+            if timed_out:
+                # Out of time: pick the chunk's key sentences instead
+                degraded = True
+                summary = summarize_extractive(text_chunks[i], chunk_lengths[i][0])
+            elif summary is None:
                 # Create a fallback summary instead of using the whole chunk
-                fallback = ' '.join(chunk.split()[:chunk_max_length])
-                summaries.append(fallback)
-        
-        # Post-process and combine summaries for better coherence
-        processed_summaries = []
-        for i, summary in enumerate(summaries):
-            # Clean up the summary
-            clean_summary = summary.strip()
+                summary = ' '.join(text_chunks[i].split()[:chunk_lengths[i][0]]) if polish else text_chunks[i]
+            elif cache is not None:
+                # The model's own output is cached, so both output formats share it
+                cache.set(chunk_keys[i], summary)
+        
+        if polish:
+            # Post-process each summary for better coherence
+            summary = _clean_chunk_summary(summary)
+        processed_summaries.append(summary)
+        yield {"event": "chunk", "index": i, "total": len(text_chunks), "summary": summary}
+    
+    # Ensure the summary doesn't exceed the max word limit
+    if polish:
+        final_summary = _truncate_summary(_join_chunk_summaries(processed_summaries), max_words)
+    else:
+        final_summary = " ".join(" ".join(processed_summaries).split()[:max_words])
+    if cache is not None and not degraded:
+        cache.set(summary_key, final_summary)
+    yield {"event": "summary", "summary": final_summary, "degraded": degraded}
+
+def summarize_multi_length(text, model_choice, max_words_list, optimize_for_rouge=True, batch_size=None, use_cache=True):
+    """
+    Summarize a text at several target lengths, encoding each chunk only once.
+
+    The encoder states of each batch of chunks are computed once and every target length is
+    decoded from them. Chunking, per-chunk length budgets, decoding parameters and the chunk summary
+    cache are shared with summarize_text_stream. Each summary matches a separate summarize_text call
+    only under deterministic decoding (optimize_for_rouge=False, for any model but t5-3b, whose
+    parameters always sample); the default parameters sample, so every call draws new summaries.
+
+    :param text: Text to summarize.
+    :param model_choice: Key of the models dict, or "auto".
+    :param max_words_list: Target lengths in words, e.g. [50, 150, 300].
+    :param optimize_for_rouge: Use the ROUGE-oriented decoding parameters.
+    :param batch_size: Chunks encoded together (defaults to SUMMARY_BATCH_SIZE).
+    :param use_cache: Reuse and store chunk summaries in the summary cache.
+    :return: Dict mapping each target length to its summary.
+    """
+    targets = list(dict.fromkeys(max_words_list))
+    if model_choice == AUTO_MODEL:
+        model_choice = route_model(text, max(targets), "standard")
+    if model_choice == EXTRACTIVE_MODEL:
+        return {max_words: summarize_extractive(text, max_words) for max_words in targets}
+    
+    import torch
+    from transformers.modeling_outputs import BaseModelOutput
+    
+    # Running the encoder on its own needs the PyTorch model
+    model = get_summarizer(model_choice, backend="pytorch")
+    token_chunks = chunk_text_by_tokens(text, model.tokenizer, content_defined=use_cache)
+    text_chunks = [chunk for chunk, _ in token_chunks]
+    chunk_sizes = [n_tokens for _, n_tokens in token_chunks]
+    params = decoding_params(model_choice, optimize_for_rouge)
+    lengths = {
+        max_words: [chunk_length_budget(len(chunk.split()), len(text_chunks), max_words) for chunk in text_chunks]
+        for max_words in targets
+    }
+    
+    # Chunk summaries already cached for a length need no decoding at that length
+    cache = get_summary_cache() if use_cache else None
+    summaries = {max_words: [None] * len(text_chunks) for max_words in targets}
+    if cache is not None:
+        chunk_keys = {
+            max_words: [cache.key("chunk", chunk, model_choice, *chunk_lengths, params)
+                        for chunk, chunk_lengths in zip(text_chunks, lengths[max_words])]
+            for max_words in targets
+        }
+        for max_words in targets:
+            summaries[max_words] = [cache.get(key) for key in chunk_keys[max_words]]
+    pending = [i for i in range(len(text_chunks)) if any(summaries[max_words][i] is None for max_words in targets)]
+    logging.info(f"Encoding {len(pending)} of {len(text_chunks)} chunks for {len(targets)} summary lengths")
+    
+    # Similarly sized chunks share a batch to keep padding low
+    pending.sort(key=lambda i: chunk_sizes[i])
+    batch_size = batch_size or SUMMARY_BATCH_SIZE
+    hf_model = model.model
+    prefix = model.prefix or ""
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        inputs = model.tokenizer([prefix + text_chunks[i] for i in batch], padding=True, return_tensors="pt").to(hf_model.device)
+        with torch.no_grad():
+            encoder_states = hf_model.get_encoder()(
+                input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"]
+            ).last_hidden_state
             
-            # Ensure the summary ends with proper punctuation
-            if clean_summary and clean_summary[-1] not in '.!?':
-                clean_summary += '.'
+            for max_words in targets:
+                # Chunks of the batch with the same length budget are decoded together
+                groups = {}
+                for j, i in enumerate(batch):
+                    if summaries[max_words][i] is None:
+                        groups.setdefault(lengths[max_words][i], []).append(j)
                 
-            processed_summaries.append(clean_summary)
+                for (max_length, min_length), todo in groups.items():
+                    try:
+                        # generate expands the encoder outputs in place for beam search, so every call
+                        # gets its own BaseModelOutput over a copy of the shared states
+                        output_ids = hf_model.generate(
+                            encoder_outputs=BaseModelOutput(last_hidden_state=encoder_states[todo]),
+                            attention_mask=inputs["attention_mask"][todo],
+                            generation_config=model.generation_config,
+                            max_length=max_length,
+                            min_length=min_length,
+                            **params
+                        )
+                        decoded = model.tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+                    except Exception as e:
+                        logging.error(f"Summarization error at max_words={max_words}: {e}")
+                        decoded = [None] * len(todo)
+                    
+                    for j, summary in zip(todo, decoded):
+                        i = batch[j]
+                        if summary is None:
+                            # Create a fallback summary instead of using the whole chunk
+                            summaries[max_words][i] = ' '.join(text_chunks[i].split()[:max_length])
+                        else:
+                            summaries[max_words][i] = summary
+                            if cache is not None:
+                                cache.set(chunk_keys[max_words][i], summary)
+    
+    return {
+        max_words: _truncate_summary(
+            _join_chunk_summaries([_clean_chunk_summary(summary) for summary in summaries[max_words]]), max_words
+        )
+        for max_words in targets
+    }
+
+def summarize_text(text, model_choice, max_words=None, optimize_for_rouge=True, batch_size=None, hierarchical=False,
+                   use_cache=True, prefilter=False, deadline_ms=None, assisted=False, latency_tier="standard"):
+    """Enhanced summarization function with ROUGE optimization"""
+    try:
+        # Get the maximum word limit from user input if not provided
+        if max_words is None:
+            max_words = int(input("Enter maximum word limit for the summary (recommended: 20-30% of original length): "))
         
-        # Join summaries with proper spacing and connectors for better flow
-        if len(processed_summaries) > 1:
-            # Add transition phrases between chunks for better coherence
-            transitions = ["", "Furthermore, ", "Additionally, ", "Moreover, ", "In addition, "]
-            final_summary = processed_summaries[0]
-            
-            for i, summary in enumerate(processed_summaries[1:], 1):
-                transition = transitions[min(i, len(transitions)-1)]
-                final_summary += " " + transition + summary
+        # Let the router pick a model that fits the input size and latency tier
+        if model_choice == AUTO_MODEL:
+            model_choice = route_model(text, max_words, latency_tier)
+        
+        # Very long documents are reduced level by level instead of chunk by chunk (sentence ranking needs
+        # neither, under a deadline the planner pre-filters them instead, and assisted decoding is chunk by chunk)
+        if hierarchical and model_choice != EXTRACTIVE_MODEL and not deadline_ms and not assisted:
+            # Repeat requests with identical settings are served from the summary cache
+            cache = get_summary_cache() if use_cache else None
+            final_summary = None
+            if cache is not None:
+                cache_key = cache.key("summarize_text", text, model_choice, max_words, hierarchical, prefilter,
+                                      decoding_params(model_choice, optimize_for_rouge))
+                final_summary = cache.get(cache_key)
+            if final_summary is None:
+                source_text = text
+                if prefilter:
+                    source_text, _ = extractive_prefilter(text, get_summarizer(model_choice).tokenizer, max_words)
+                final_summary = summarize_hierarchical(source_text, model_choice, max_words, optimize_for_rouge, batch_size)
+                if cache is not None:
+                    cache.set(cache_key, final_summary)
         else:
-            final_summary = processed_summaries[0] if processed_summaries else ""
-        
-        # Ensure the summary doesn't exceed the max word limit
-        final_summary_words = final_summary.split()
-        if len(final_summary_words) > max_words:
-            final_summary = " ".join(final_summary_words[:max_words])
-            # Ensure the truncated summary ends with proper punctuation
-            if not final_summary.endswith(('.', '!', '?')):
-                final_summary += '.'
+            # The stream caches whole summaries under the decoding settings it actually uses
+            final_summary = ""
+            for event in summarize_text_stream(text, model_choice, max_words, optimize_for_rouge, batch_size, use_cache,
+                                               prefilter, deadline_ms, assisted):
+                if event["event"] == "summary":
+                    final_summary = event["summary"]
         
         # Calculate and log ROUGE scores if original text is available
         try:
@@ -269,35 +2037,307 @@ def summarize_text(text, model_choice, max_words=None, optimize_for_rouge=True):
 
 
 # Additional Features
+ENTITY_PIPES = ("tok2vec", "ner")  # spaCy components entity extraction needs; the rest are skipped
+CAPTION_DISABLED_PIPES = ("ner", "lemmatizer")  # Caption parsing only needs dependencies and POS tags
+NLP_MAX_CHARS = 100000  # Longer texts are parsed in pieces, well under spaCy's max_length
+NLP_BATCH_SIZE = 64  # Texts per nlp.pipe batch
+NLP_PROCESSES = int(os.environ.get("SUMMARIZER_NLP_PROCESSES", "1"))  # spaCy worker processes for multi-piece jobs
+
+def text_pieces(text, max_chars=NLP_MAX_CHARS, index=None):
+    """
+    Split a text at sentence boundaries into pieces of at most max_chars characters.
+
+    :param text: Text to split.
+    :param max_chars: Largest piece; a single longer sentence is cut at whitespace.
+    :param index: Optional SentenceIndex of text, to reuse an existing sentence split.
+    :return: List of pieces, a single one for texts that already fit.
+    """
+    if len(text) <= max_chars:
+        return [text]
+    index = index or SentenceIndex(text)
+    # Each sentence counts with the whitespace after it, so a range's size is its span's length
+    sizes = [next_start - start for start, next_start in zip(index.starts, index.starts[1:])]
+    if len(index):
+        sizes.append(index.ends[-1] - index.starts[-1])
+    pieces = []
+    for first, last in index.pack(sizes, max_chars):
+        start, end = index.span(first, last)
+        while end - start > max_chars:
+            cut = text.rfind(" ", start + 1, start + max_chars)
+            cut = cut if cut > start else start + max_chars
+            pieces.append(text[start:cut])
+            start = cut
+        pieces.append(text[start:end])
+    # Whitespace only
+    return pieces or [""]
+
+def parse_texts(texts, keep=None, disable=(), n_process=1, batch_size=NLP_BATCH_SIZE):
+    """
+    Parse texts with spaCy in batches, running only the components that are needed.
+
+    :param texts: Iterable of texts, each within spaCy's max_length (see text_pieces).
+    :param keep: Optional names of the only components to run.
+    :param disable: Names of components to skip.
+    :param n_process: Worker processes for nlp.pipe; more than 1 pays off for bulk jobs only.
+    :param batch_size: Texts per batch.
+    :return: Iterator of Docs in the order of texts.
+    """
+    nlp = get_nlp()
+    disabled = [name for name in nlp.pipe_names if name in disable or (keep is not None and name not in keep)]
+    return nlp.pipe(texts, disable=disabled, n_process=n_process, batch_size=batch_size)
+
+def _merge_docs(docs):
+    from spacy.tokens import Doc
+    return docs[0] if len(docs) == 1 else Doc.from_docs(docs)
+
+class DocumentAnalysis:
+    """
+    A document parsed once for all the analyses run on it.
+
+    Sentences, the spaCy Doc, the TextBlob and the preprocessed text are built on first use
+    and kept, so running several analyses does not tokenize the same text over and over.
+    The analysis functions accept either a DocumentAnalysis or a plain string. Safe to share
+    between threads: each artifact is built once even when several analyses ask for it at once.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self._artifacts = {}
+        self._lock = threading.Lock()
+        self._artifact_locks = {}
+
+    def artifact(self, name, build):
+        """Artifact stored under name, built by the zero-argument callable on first use"""
+        with self._lock:
+            if name in self._artifacts:
+                return self._artifacts[name]
+            artifact_lock = self._artifact_locks.setdefault(name, threading.Lock())
+        # Build outside the document lock so other artifacts can be built at the same time
+        with artifact_lock:
+            with self._lock:
+                if name in self._artifacts:
+                    return self._artifacts[name]
+            value = build()
+            with self._lock:
+                self._artifacts[name] = value
+        return value
+
+    def sentence_index(self):
+        return self.artifact("sentence_index", lambda: SentenceIndex(self.text))
+
+    def sentences(self):
+        return self.artifact("sentences", lambda: self.sentence_index().sentences())
+
+    def spacy_doc(self):
+        """spaCy Doc with only the components in ENTITY_PIPES run, parsed piece by piece when the text is long"""
+        def parse():
+            pieces = text_pieces(self.text, index=self.sentence_index() if len(self.text) > NLP_MAX_CHARS else None)
+            n_process = NLP_PROCESSES if len(pieces) > 1 else 1
+            return _merge_docs(list(parse_texts(pieces, keep=ENTITY_PIPES, n_process=n_process)))
+        return self.artifact("spacy_doc", parse)
+
+    def blob(self):
+        def parse():
+            from textblob import TextBlob
+            return TextBlob(self.text)
+        return self.artifact("blob", parse)
+
+    def preprocessed(self):
+        return self.artifact("preprocessed", lambda: preprocess_text(self.text))
+
+def as_document(text):
+    """DocumentAnalysis for a text, or the given DocumentAnalysis itself"""
+    return text if isinstance(text, DocumentAnalysis) else DocumentAnalysis(text)
+
 def extract_keywords(text):
+    from rake_nltk import Rake
     r = Rake()
-    r.extract_keywords_from_text(text)
+    # Same sentences Rake would split the text into itself, from the shared index
+    r.extract_keywords_from_sentences(as_document(text).sentences())
     return r.get_ranked_phrases()
 
 def extract_entities(text):
-    doc = nlp(text)
+    doc = as_document(text).spacy_doc()
     return [(ent.text, ent.label_) for ent in doc.ents]
 
+def extract_entities_many(texts, n_process=None):
+    """
+    Named entities of many documents, parsed as one stream of batches.
+
+    :param texts: Iterable of documents of any length.
+    :param n_process: spaCy worker processes; defaults to SUMMARIZER_NLP_PROCESSES.
+    :return: List with the (text, label) entities of each document, in the order of the input.
+    """
+    texts = list(texts)
+    owners, pieces = [], []
+    for i, text in enumerate(texts):
+        for piece in text_pieces(text):
+            owners.append(i)
+            pieces.append(piece)
+    
+    entities = [[] for _ in texts]
+    docs = parse_texts(pieces, keep=ENTITY_PIPES, n_process=n_process or NLP_PROCESSES)
+    for owner, doc in zip(owners, docs):
+        entities[owner].extend((ent.text, ent.label_) for ent in doc.ents)
+    return entities
+
 def analyze_sentiment(text):
-    return TextBlob(text).sentiment.polarity
+    return as_document(text).blob().sentiment.polarity
 
 def detect_bias(text):
-    classifier = pipeline("text-classification", model="facebook/bart-large-mnli")
+    classifier = get_zero_shot_classifier()
     labels = ["biased", "neutral"]
-    result = classifier(text, candidate_labels=labels)
+    result = classifier(as_document(text).text, candidate_labels=labels)
     return result
 
-def classify_topic(text):
-    classifier = pipeline("zero-shot-classification")
-    labels = ["Finance", "Health", "Technology", "Education"]
-    result = classifier(text, candidate_labels=labels)
-    return result["labels"][0]
+# Topic classification
+# Documents and labels are embedded by the same sentence encoder and compared by cosine
+# similarity. Label embeddings are computed once per label set, so classifying a document
+# costs one encoder pass over its chunks plus one matrix product, however many labels there are.
+EMBEDDING_MODEL = os.environ.get("SUMMARIZER_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_MAX_TOKENS = 256  # Sequence length the default encoder was trained on
+EMBEDDING_MAX_CHUNKS = 64  # Chunks embedded per document; longer documents are sampled evenly
+LABEL_TEMPLATE = "This text is about {}."
+LABEL_CACHE_SIZE = 16  # Label sets whose embeddings are kept
+
+def load_topic_labels():
+    """
+    Topic labels from SUMMARIZER_TOPIC_LABELS: a comma separated list, or the path of a JSON
+    file holding a list of labels or a {label: description or [descriptions]} taxonomy.
+    """
+    value = os.environ.get("SUMMARIZER_TOPIC_LABELS", "Finance,Health,Technology,Education")
+    if value.endswith(".json"):
+        with open(value, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return [label.strip() for label in value.split(",") if label.strip()]
+
+_topic_labels = None
+_topic_labels_lock = threading.Lock()
+
+def get_topic_labels():
+    """Topic labels from load_topic_labels, read on first use so a bad labels file only fails classification"""
+    global _topic_labels
+    if _topic_labels is None:
+        with _topic_labels_lock:
+            if _topic_labels is None:
+                _topic_labels = load_topic_labels()
+    return _topic_labels
+
+_label_embeddings = OrderedDict()
+_label_embeddings_lock = threading.Lock()
+
+def embed_texts(texts, model_name=None, batch_size=32):
+    """Mean-pooled, unit-length sentence embeddings of texts as a float32 array of shape (len(texts), dim)"""
+    import numpy as np
+    import torch
+    tokenizer, model = get_embedding_model(model_name)
+    vectors = []
+    with torch.inference_mode():
+        for batch in _batched(texts, batch_size):
+            encoded = tokenizer(batch, padding=True, truncation=True, max_length=EMBEDDING_MAX_TOKENS, return_tensors="pt")
+            hidden = model(**encoded).last_hidden_state
+            # Average over real tokens only, not padding
+            mask = encoded["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            vectors.append(torch.nn.functional.normalize(pooled, dim=-1).float().numpy())
+    if not vectors:
+        return np.zeros((0, model.config.hidden_size), dtype=np.float32)
+    return np.concatenate(vectors)
+
+def label_embeddings(labels, model_name=None):
+    """
+    Embedding of each label, computed once per label set and cached.
+
+    :param labels: List of label names, or a {label: description or [descriptions]} taxonomy,
+                   where a label's embedding is the centroid of its descriptions.
+    :param model_name: Sentence encoder, EMBEDDING_MODEL by default.
+    :return: (label names, unit-length float32 matrix with one row per label).
+    """
+    import numpy as np
+    model_name = model_name or EMBEDDING_MODEL
+    if isinstance(labels, dict):
+        taxonomy = [(label, [descriptions] if isinstance(descriptions, str) else list(descriptions) or [label])
+                    for label, descriptions in labels.items()]
+    else:
+        taxonomy = [(label, [label]) for label in labels]
+    key = (model_name, tuple((label, tuple(descriptions)) for label, descriptions in taxonomy))
+    
+    with _label_embeddings_lock:
+        if key in _label_embeddings:
+            _label_embeddings.move_to_end(key)
+            return _label_embeddings[key]
+    
+    # All descriptions of all labels in one batched encoder pass
+    phrases = [LABEL_TEMPLATE.format(description) for _, descriptions in taxonomy for description in descriptions]
+    vectors = embed_texts(phrases, model_name)
+    owners = np.repeat(np.arange(len(taxonomy)), [len(descriptions) for _, descriptions in taxonomy])
+    centroids = np.zeros((len(taxonomy), vectors.shape[1]), dtype=np.float32)
+    np.add.at(centroids, owners, vectors)
+    centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-9)
+    entry = ([label for label, _ in taxonomy], centroids)
+    
+    with _label_embeddings_lock:
+        _label_embeddings[key] = entry
+        while len(_label_embeddings) > LABEL_CACHE_SIZE:
+            _label_embeddings.popitem(last=False)
+    return entry
+
+def document_embedding(text, model_name=None):
+    """
+    Unit-length embedding of a whole document: the token-weighted mean of its chunk embeddings.
+
+    Unlike a single encoder pass, nothing past the encoder's context is cut off. Documents
+    longer than EMBEDDING_MAX_CHUNKS chunks are represented by chunks sampled evenly across them.
+    Accepts a DocumentAnalysis, which keeps the embedding for later calls.
+    """
+    import numpy as np
+    model_name = model_name or EMBEDDING_MODEL
+    document = as_document(text)
+    
+    def embed():
+        tokenizer, _ = get_embedding_model(model_name)
+        chunks = chunk_text_by_tokens(document.text, tokenizer, max_tokens=EMBEDDING_MAX_TOKENS,
+                                      index=document.sentence_index() if document.text else None)
+        if len(chunks) > EMBEDDING_MAX_CHUNKS:
+            step = (len(chunks) - 1) / (EMBEDDING_MAX_CHUNKS - 1)
+            chunks = [chunks[round(i * step)] for i in range(EMBEDDING_MAX_CHUNKS)]
+        if not chunks:
+            chunks = [(document.text, 1)]
+        vectors = embed_texts([chunk for chunk, _ in chunks], model_name)
+        weights = np.array([max(n_tokens, 1) for _, n_tokens in chunks], dtype=np.float32)
+        pooled = weights @ vectors
+        return pooled / max(np.linalg.norm(pooled), 1e-9)
+    
+    return document.artifact(("embedding", model_name), embed)
+
+def classify_topics(text, labels=None, top_k=None, model_name=None):
+    """
+    Rank topic labels by how close they are to a document.
+
+    :param text: Document text or DocumentAnalysis.
+    :param labels: Label names or taxonomy (see label_embeddings); get_topic_labels() by default.
+    :param top_k: Number of labels to return, all of them by default.
+    :param model_name: Sentence encoder, EMBEDDING_MODEL by default.
+    :return: List of (label, cosine similarity) pairs, best first.
+    """
+    import numpy as np
+    names, matrix = label_embeddings(labels or get_topic_labels(), model_name)
+    scores = matrix @ document_embedding(text, model_name)
+    top_k = min(top_k or len(names), len(names))
+    # Only the top_k best need sorting, which matters for large taxonomies
+    best = np.argpartition(-scores, top_k - 1)[:top_k]
+    best = best[np.argsort(-scores[best])]
+    return [(names[i], float(scores[i])) for i in best]
+
+def classify_topic(text, labels=None):
+    return classify_topics(text, labels, top_k=1)[0][0]
 
 def compression_ratio(original, summary):
     return (1 - len(summary) / len(original)) * 100
 
 def readability_score(text):
-    return round(textstat.flesch_reading_ease(text), 2)  # Round for consistency
+    import textstat
+    return round(textstat.flesch_reading_ease(as_document(text).text), 2)  # Round for consistency
 
 # Evaluation Metrics
 def evaluate_rouge_scores(reference, summary):
@@ -353,6 +2393,7 @@ def evaluate_summary(original_text, summary_text):
 # File Handling Functions
 def read_pdf(file_path):
     try:
+        import PyPDF2
         with open(file_path, "rb") as f:
             reader = PyPDF2.PdfReader(f)
             return "\n".join([page.extract_text() for page in reader.pages if page.extract_text()])
@@ -360,7 +2401,6 @@ def read_pdf(file_path):
         logging.error(f"PDF reading error: {e}")
         return "Error reading PDF file."
 
-import easyocr
 import logging
 import os
 
@@ -369,6 +2409,8 @@ logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
 
 def extract_text_from_image(image_path):
     try:
+        import easyocr
+
         # Initialize EasyOCR reader (English language, using GPU if available)
         reader = easyocr.Reader(['en'], gpu=True)
 
@@ -406,9 +2448,11 @@ def transcribe_audio(file_path: str) -> str:
         if not os.path.exists(file_path):
             return "Error: Audio file not found. Please check the file path."
 
-        # Load pre-trained model and tokenizer
-        tokenizer = Wav2Vec2Tokenizer.from_pretrained("facebook/wav2vec2-base-960h")
-        model = Wav2Vec2ForCTC.from_pretrained("facebook/wav2vec2-base-960h")
+        import librosa
+        import torch
+
+        # Get the shared pre-trained model and tokenizer
+        tokenizer, model = get_wav2vec2()
         
         # Load audio
         sample_rate = 16000
@@ -459,17 +2503,16 @@ def summarize_video(video_path: str) -> str:
     frame_descriptions = []
     
     try:
+        import cv2
+        import torch
+        import numpy as np
+
         if not os.path.exists(video_path):
             return "Error: Video file not found. Please check the file path."
             
-        # Load pre-trained vision-language model for image captioning
-        model = VisionEncoderDecoderModel.from_pretrained("nlpconnect/vit-gpt2-image-captioning")
-        feature_extractor = ViTImageProcessor.from_pretrained("nlpconnect/vit-gpt2-image-captioning")
-        tokenizer = AutoTokenizer.from_pretrained("nlpconnect/vit-gpt2-image-captioning")
-        
-        # Set device to GPU if available
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        model.to(device)
+        # Get the shared pre-trained vision-language model for image captioning
+        model, feature_extractor, tokenizer = get_caption_model()
+        device = model.device
         
         # Open the video file
         cap = cv2.VideoCapture(video_path)
@@ -667,6 +2710,7 @@ def summarize_video(video_path: str) -> str:
                     
                     # Try with pydub as last resort
                     try:
+                        from pydub import AudioSegment
                         video = AudioSegment.from_file(video_path)
                         video.export(temp_audio_path, format="wav")
                         has_valid_audio = os.path.exists(temp_audio_path) and os.path.getsize(temp_audio_path) > 0
@@ -687,7 +2731,7 @@ def summarize_video(video_path: str) -> str:
                 # If Wav2Vec2 fails, try Whisper
                 if not has_transcription:
                     try:
-                        whisper_model = whisper.load_model("base")
+                        whisper_model = get_whisper_model("base")
                         result = whisper_model.transcribe(temp_audio_path)
                         audio_transcription = result["text"]
                         has_transcription = audio_transcription and len(audio_transcription) > 10
@@ -743,7 +2787,6 @@ def summarize_video(video_path: str) -> str:
         # Enhanced caption grouping using text similarity
         from sklearn.feature_extraction.text import TfidfVectorizer
         from sklearn.metrics.pairwise import cosine_similarity
-        import numpy as np
         
         # Create TF-IDF vectors for all captions
         vectorizer = TfidfVectorizer(stop_words='english')
@@ -831,6 +2874,19 @@ def summarize_video(video_path: str) -> str:
         # Determine narrative position for each group
         total_groups = len(grouped_captions)
         
+        # Parse every caption text the groups below look at in one batched pass, without NER
+        caption_texts = []
+        for group in grouped_captions:
+            if len(group) > 1:
+                caption_texts.append(" ".join(group))
+                caption_texts.extend(group[1:])
+        caption_texts = list(dict.fromkeys(caption_texts))
+        try:
+            caption_docs = dict(zip(caption_texts, parse_texts(caption_texts, disable=CAPTION_DISABLED_PIPES))) if caption_texts else {}
+        except Exception as e:
+            logging.error(f"Error parsing captions: {e}")
+            caption_docs = {}
+        
         for i, group in enumerate(grouped_captions):
             # Choose an appropriate transition based on narrative position
             if i == 0:
@@ -862,7 +2918,7 @@ def summarize_video(video_path: str) -> str:
                 # Extract key subjects, actions, and objects from the captions
                 try:
                     # Use spaCy for better linguistic analysis
-                    doc = nlp(" ".join(group))
+                    doc = caption_docs[" ".join(group)]
                     
                     # Extract main subjects and objects
                     subjects = []
@@ -891,7 +2947,7 @@ def summarize_video(video_path: str) -> str:
                         additional_details = []
                         for caption in group[1:]:
                             # Extract unique phrases not in the main description
-                            caption_doc = nlp(caption)
+                            caption_doc = caption_docs[caption]
                             for chunk in caption_doc.noun_chunks:
                                 if chunk.text.lower() not in combined.lower():
                                     additional_details.append(chunk.text)
@@ -936,7 +2992,7 @@ def summarize_video(video_path: str) -> str:
         # Post-process with GPT or T5 for grammar correction and improved readability
         try:
             # Use a pre-trained T5 model for grammar correction
-            grammar_model = pipeline("text2text-generation", model="google/t5-small")
+            grammar_model = get_model("text2text-generation", "google/t5-small")
             corrected_narrative = grammar_model(f"grammar: {narrative}", max_length=len(narrative.split()) + 50)[0]['generated_text']
             
             # Only use the corrected version if it's not significantly shorter than the original
@@ -953,11 +3009,11 @@ def summarize_video(video_path: str) -> str:
         intro = ""
         if has_valid_audio and 'processed_transcription' in locals():
             # Extract the first sentence or two from audio transcription for intro
-            audio_sentences = sent_tokenize(processed_transcription)
-            if audio_sentences:
-                intro = f"Introduction: {audio_sentences[0]}"
+            audio_sentences = SentenceIndex(processed_transcription)
+            if len(audio_sentences):
+                intro = f"Introduction: {audio_sentences.sentence(0)}"
                 if len(audio_sentences) > 1:
-                    intro += f" {audio_sentences[1]}"
+                    intro += f" {audio_sentences.sentence(1)}"
         
         if not intro and paragraphs:
             # Use the first paragraph as introduction if no audio
@@ -1017,7 +3073,7 @@ def summarize_video(video_path: str) -> str:
                         
                         # Try transcribing with Whisper first (usually more reliable)
                         try:
-                            whisper_model = whisper.load_model("base")
+                            whisper_model = get_whisper_model("base")
                             result = whisper_model.transcribe(temp_audio_path)
                             processed_transcription = result["text"].strip()
                             
@@ -1056,20 +3112,24 @@ def summarize_video(video_path: str) -> str:
                 # Use the existing summarization function to create a concise summary of the transcription
                 print("Summarizing audio transcription...")
                 try:
-                    # Initialize a summarization model
-                    model_name = "facebook/bart-large-cnn"
-                    summarizer = pipeline("summarization", model=model_name, tokenizer=model_name, framework="pt", device=0 if torch.cuda.is_available() else -1)
+                    # Get the shared summarization model
+                    summarizer = get_summarizer("bart-large")
                     
-                    # Split text into manageable chunks and summarize each chunk
+                    # Split text into manageable chunks and summarize them in batches
                     text_chunks = chunk_text(processed_transcription)
-                    transcription_summaries = []
+                    transcription_summaries = list(text_chunks)
                     
-                    for chunk in text_chunks:
-                        if len(chunk.split()) > 10:  # Only summarize if there's enough content
-                            summary_output = summarizer(chunk, max_length=100, min_length=30, do_sample=False)
-                            transcription_summaries.append(summary_output[0]['summary_text'])
-                        else:
-                            transcription_summaries.append(chunk)
+                    # Only summarize chunks with enough content
+                    long_chunks = [i for i, chunk in enumerate(text_chunks) if len(chunk.split()) > 10]
+                    chunk_summaries = generate_summaries(
+                        summarizer,
+                        [text_chunks[i] for i in long_chunks],
+                        [(100, 30)] * len(long_chunks),
+                        do_sample=False
+                    )
+                    for i, chunk_summary in zip(long_chunks, chunk_summaries):
+                        if chunk_summary is not None:
+                            transcription_summaries[i] = chunk_summary
                     
                     # Combine summaries
                     processed_transcription = " ".join(transcription_summaries)
@@ -1085,9 +3145,8 @@ def summarize_video(video_path: str) -> str:
             
             # Create a more coherent narrative by combining visual and audio information
             try:
-                # Initialize a summarization model for the final integration
-                model_name = "facebook/bart-large-cnn"
-                integrator = pipeline("summarization", model=model_name, tokenizer=model_name, framework="pt", device=0 if torch.cuda.is_available() else -1)
+                # Get the shared summarization model for the final integration
+                integrator = get_summarizer("bart-large")
                 
                 # Combine visual narrative and processed transcription with clear separation
                 combined_text = f"Visual content: {narrative} Audio content: {processed_transcription}"
@@ -1103,7 +3162,7 @@ def summarize_video(video_path: str) -> str:
                 # Post-process with T5 for paraphrasing and grammar cleanup
                 try:
                     # Use a pre-trained T5 model for paraphrasing
-                    paraphrase_model = pipeline("text2text-generation", model="google/t5-small")
+                    paraphrase_model = get_model("text2text-generation", "google/t5-small")
                     paraphrased_summary = paraphrase_model(
                         f"paraphrase: {integrated_summary[0]['summary_text']}", 
                         max_length=len(integrated_summary[0]['summary_text'].split()) + 50,
@@ -1216,31 +3275,24 @@ def answer_question(text, ask):
     :return: Detailed answer extracted from the text.
     """
     try:
-        # Always use CPU to avoid CUDA errors
-        device = -1  # Force CPU usage
-        
-        # Initialize the QA pipeline with the latest model
-        qa_model = pipeline(
-            "question-answering", 
-            model="deepset/roberta-base-squad2",
-            device=device
-        )
+        # Get the shared QA pipeline
+        qa_model = get_qa_model()
         
         # For very long texts, use chunking to process in parts
         if len(text.split()) > 500:
-            # Split text into chunks with overlap
-            chunks = chunk_text(text, chunk_size=500, overlap=150, respect_sentences=True)
+            # Split the text into sentences once and build overlapping chunks from their offsets
+            index = SentenceIndex(text)
             
             # Process each chunk and collect answers
             answers = []
             scores = []
             contexts = []
             
-            for chunk in chunks:
+            for start, end in index.chunk_spans(chunk_size=500, overlap=150):
                 # Get answer from this chunk
                 result = qa_model(
                     question=ask, 
-                    context=chunk
+                    context=text[start:end]
                 )
                 
                 # Store answer, score and context
@@ -1248,12 +3300,7 @@ def answer_question(text, ask):
                 scores.append(result["score"])
                 
                 # Store the sentence containing this answer for context
-                for sentence in sent_tokenize(chunk):
-                    if result["answer"] in sentence:
-                        contexts.append(sentence)
-                        break
-                else:
-                    contexts.append("")  # No context found
+                contexts.append(index.sentence(index.find(start + result["start"])))
             
             # Find the best answer based on confidence score
             if answers:
@@ -1285,9 +3332,9 @@ def answer_question(text, ask):
                 return result["answer"]
             elif result["score"] > 0.5:
                 # Find the sentence containing this answer for context
-                for sentence in sent_tokenize(text):
-                    if result["answer"] in sentence:
-                        return f"{result['answer']} (Context: {sentence})"
+                index = SentenceIndex(text)
+                if len(index):
+                    return f"{result['answer']} (Context: {index.sentence(index.find(result['start']))})"
                 return result["answer"]
             else:
                 return f"{result['answer']} (Note: Low confidence answer)"
@@ -1297,11 +3344,7 @@ def answer_question(text, ask):
         # Try a simpler fallback approach with DistilBERT model
         try:
             # Fallback to a simpler model if available
-            fallback_model = pipeline(
-                "question-answering", 
-                model="distilbert-base-cased-distilled-squad",
-                device=-1  # Force CPU for fallback
-            )
+            fallback_model = get_qa_model("distilbert-base-cased-distilled-squad")
             
             result = fallback_model(
                 question=ask, 
@@ -1396,6 +3439,7 @@ def save_as_json(data, filename="summary_output.json"):
         json.dump(data, f, indent=4)
 
 def save_as_pdf(text, filename="summary_output.pdf"):
+    from fpdf import FPDF
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Arial", size=12)
@@ -1403,6 +3447,7 @@ def save_as_pdf(text, filename="summary_output.pdf"):
     pdf.output(filename)
 
 def save_as_docx(text, filename="summary_output.docx"):
+    from docx import Document
     doc = Document()
     doc.add_paragraph(text)
     doc.save(filename)
@@ -1410,7 +3455,7 @@ def save_as_docx(text, filename="summary_output.docx"):
 # Main Application
 def main():
     print("Welcome to the Advanced Text Summarizer!")
-    print("Choose a summarization model (t5-small/bart-large/distilbart/pegasus/t5-3b):")
+    print("Choose a summarization model (t5-small/bart-large/distilbart/pegasus/t5-3b/extractive/auto):")
     model_choice = input("Model: ")
     user_input = ""
 
@@ -1461,6 +3506,9 @@ def main():
             print("Empty input! Try again.")
             continue
 
+        from langdetect import detect
+        from deep_translator import GoogleTranslator
+
         language = detect(user_input)
         if language != "en":
             print(f"Detected language: {language}, translating to English...")
@@ -1468,7 +3516,7 @@ def main():
 
 
         processed_text = preprocess_text(user_input)
-        summary = summarize_text(processed_text, model_choice)
+        summary = summarize_text(processed_text, model_choice, use_cache=True)
 
 
         print("\nSummary:")
@@ -1499,629 +3547,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-=======
-import re
-import json
-import logging
-import nltk
-from transformers import pipeline
-from textwrap import wrap
-from langdetect import detect
-from nltk.corpus import stopwords
-from textblob import TextBlob
-from deep_translator import GoogleTranslator
-from nltk.tokenize import sent_tokenize, word_tokenize
-from rake_nltk import Rake
-import spacy
-import PyPDF2
-import pytesseract
-from PIL import Image
-import whisper
-from fpdf import FPDF
-from docx import Document
-import textstat
-import easyocr 
-import speech_recognition as sr
-import torch
-import openai
-import os
-from pydub import AudioSegment
-import librosa
-import torch
-from transformers import Wav2Vec2ForCTC, Wav2Vec2Tokenizer
-import cv2
-from transformers import VisionEncoderDecoderModel, ViTImageProcessor, AutoTokenizer
-
-
-# Initialize necessary components
-logging.basicConfig(filename="summarizer.log", level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
-models = {
-    "t5-small": "t5-small",
-    "bart-large": "facebook/bart-large-cnn",
-    "distilbart": "sshleifer/distilbart-cnn-12-6",
-    "pegasus": "google/pegasus-xsum",
-    "t5-3b": "t5-3b"
-}
-stopwords.words("english")  # Download if not already done
-nlp = spacy.load("en_core_web_sm")
-
-# Preprocessing Functions
-def preprocess_text(text):
-    text = text.lower().strip()
-    text = re.sub(r'[^a-zA-Z0-9\s]', '', text)  # Allow only alphanumeric and spaces
-    text = re.sub(r'\s+', ' ', text).strip()  # Remove extra spaces
-    words = word_tokenize(text)
-    words = [word for word in words if word.lower() not in stopwords.words("english") and len(word) > 2]
-
-    return " ".join(words)
-
-def chunk_text(text, chunk_size=500):
-    return wrap(text, width=chunk_size)
-
-# Summarization Functions
-def summarize_text(text, model_choice):
-    try:
-        # Get the maximum word limit from user input
-        max_words = int(input("Enter maximum word limit for the summary (recommended: 20-30% of original length): "))
-        
-        # Initialize the summarization model
-        model_name = models.get(model_choice, "facebook/bart-large-cnn")
-        model = pipeline("summarization", model=model_name, tokenizer=model_name, framework="pt", device=0 if torch.cuda.is_available() else -1)
-
-        
-        # Split text into manageable chunks and summarize each chunk
-        text_chunks = chunk_text(text)
-        summaries = []
-        for chunk in text_chunks:
-            try:
-                summary_output = model(chunk, max_length=max_words, min_length=10, do_sample=False)
-                summaries.append(summary_output[0]['summary_text'])
-            except Exception as e:
-                logging.error(f"Summarization error: {e}")
-                summaries.append(chunk)  # Fallback to original chunk if summarization fails
-
-
-        
-        # Combine summaries and truncate to match the max word limit
-        final_summary = " ".join(summaries)
-        final_summary_words = final_summary.split()
-        if len(final_summary_words) > max_words:
-            final_summary = " ".join(final_summary_words[:max_words])
-        
-        return final_summary
-    except Exception as e:
-        logging.error(f"Summarization error: {e}")
-        return "Error in summarization. Check logs."
-
-
-# Additional Features
-def extract_keywords(text):
-    r = Rake()
-    r.extract_keywords_from_text(text)
-    return r.get_ranked_phrases()
-
-def extract_entities(text):
-    doc = nlp(text)
-    return [(ent.text, ent.label_) for ent in doc.ents]
-
-def analyze_sentiment(text):
-    return TextBlob(text).sentiment.polarity
-
-def detect_bias(text):
-    classifier = pipeline("text-classification", model="facebook/bart-large-mnli")
-    labels = ["biased", "neutral"]
-    result = classifier(text, candidate_labels=labels)
-    return result
-
-def classify_topic(text):
-    classifier = pipeline("zero-shot-classification")
-    labels = ["Finance", "Health", "Technology", "Education"]
-    result = classifier(text, candidate_labels=labels)
-    return result["labels"][0]
-
-def compression_ratio(original, summary):
-    return (1 - len(summary) / len(original)) * 100
-
-def readability_score(text):
-    return round(textstat.flesch_reading_ease(text), 2)  # Round for consistency
-
-
-# File Handling Functions
-def read_pdf(file_path):
-    try:
-        with open(file_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            return "\n".join([page.extract_text() for page in reader.pages if page.extract_text()])
-    except Exception as e:
-        logging.error(f"PDF reading error: {e}")
-        return "Error reading PDF file."
-
-import easyocr
-import logging
-import os
-
-# Configure logging
-logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
-
-def extract_text_from_image(image_path):
-    try:
-        # Initialize EasyOCR reader (English language, using GPU if available)
-        reader = easyocr.Reader(['en'], gpu=True)
-
-        # Perform OCR
-        results = reader.readtext(image_path, detail=1)  # Returns text along with confidence
-
-        
-        
-
-        extracted_text = []
-
-        for entry in results:
-            if len(entry) >= 2:  # Ensure structure contains text and confidence
-                text, confidence = entry[1], entry[2]
-                
-                # Apply confidence threshold (e.g., 60%)
-                if confidence > 0.6:
-                    extracted_text.append(text)
-
-        final_text = "\n".join(extracted_text)  # Join text with new lines
-
-        return final_text if final_text.strip() else "No text detected."
-
-    except Exception as e:
-        return f"Error extracting text from image: {str(e)}"
-
-def transcribe_audio(file_path: str) -> str:
-    """
-    Transcribe an audio file using Wav2Vec2 model for speech recognition.
-
-    :param file_path: Path to the audio file (WAV or other formats like MP3).
-    :return: Transcribed text as a string or an error message.
-    """
-    try:
-        if not os.path.exists(file_path):
-            return "Error: Audio file not found. Please check the file path."
-
-        # Load pre-trained model and tokenizer
-        tokenizer = Wav2Vec2Tokenizer.from_pretrained("facebook/wav2vec2-base-960h")
-        model = Wav2Vec2ForCTC.from_pretrained("facebook/wav2vec2-base-960h")
-        
-        # Load audio
-        sample_rate = 16000
-        speech, rate = librosa.load(file_path, sr=sample_rate)
-        
-        # Define chunk size (30 seconds)
-        chunk_duration = 30
-        samples_per_chunk = chunk_duration * sample_rate
-
-        # Process and transcribe each chunk
-        transcriptions = []
-        for start_idx in range(0, len(speech), samples_per_chunk):
-            chunk = speech[start_idx : start_idx + samples_per_chunk]
-            input_values = tokenizer(chunk, return_tensors='pt').input_values
-            logits = model(input_values).logits
-
-            # Decode predicted token IDs
-            predicted_ids = torch.argmax(logits, dim=-1)
-            transcription = tokenizer.decode(predicted_ids[0])
-            transcriptions.append(transcription)
-
-        full_transcription = " ".join(transcriptions)
-        return full_transcription
-    
-    except Exception as e:
-        return f"Error during transcription: {str(e)}"
-    
-def summarize_video(video_path: str) -> str:
-    """
-    Analyze and summarize video content by extracting frames, generating descriptions,
-    and transcribing audio to create a comprehensive summary.
-    
-    :param video_path: Path to the video file.
-    :return: A descriptive summary of the video content or an error message.
-    """
-    try:
-        if not os.path.exists(video_path):
-            return "Error: Video file not found. Please check the file path."
-            
-        # Load pre-trained vision-language model for image captioning
-        model = VisionEncoderDecoderModel.from_pretrained("nlpconnect/vit-gpt2-image-captioning")
-        feature_extractor = ViTImageProcessor.from_pretrained("nlpconnect/vit-gpt2-image-captioning")
-        tokenizer = AutoTokenizer.from_pretrained("nlpconnect/vit-gpt2-image-captioning")
-        
-        # Set device to GPU if available
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        model.to(device)
-        
-        # Open the video file
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            return "Error: Could not open video file."
-            
-        # Get video properties
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = frame_count / fps
-        
-        # Calculate frame sampling rate (extract frames every N seconds)
-        sample_interval = 5  # Extract a frame every 5 seconds
-        frames_to_sample = int(duration / sample_interval)
-        frames_to_sample = min(frames_to_sample, 20)  # Limit to 20 frames maximum
-        
-        if frames_to_sample <= 0:
-            frames_to_sample = 1  # Ensure at least one frame is processed
-            
-        frame_interval = max(1, int(frame_count / frames_to_sample))
-        
-        # Extract frames and generate captions
-        frame_descriptions = []
-        current_frame = 0
-        
-        print(f"Analyzing video... (extracting {frames_to_sample} frames)")
-        
-        while current_frame < frame_count:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, current_frame)
-            ret, frame = cap.read()
-            
-            if not ret:
-                break
-                
-            # Convert BGR to RGB (OpenCV uses BGR by default)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Prepare image for the model
-            pixel_values = feature_extractor(images=rgb_frame, return_tensors="pt").pixel_values.to(device)
-            
-            # Generate caption
-            with torch.no_grad():
-                output_ids = model.generate(pixel_values, max_length=50, num_beams=4)
-                caption = tokenizer.decode(output_ids[0], skip_special_tokens=True)
-            
-            # Add timestamp information
-            timestamp = current_frame / fps
-            minutes, seconds = divmod(int(timestamp), 60)
-            timestamp_str = f"{minutes:02d}:{seconds:02d}"
-            
-            frame_descriptions.append(f"[{timestamp_str}] {caption}")
-            current_frame += frame_interval
-        
-        # Release video capture
-        cap.release()
-        
-        # Extract audio from video and transcribe it
-        print("Extracting and transcribing audio from video...")
-        
-        # Create a temporary audio file
-        temp_audio_path = os.path.splitext(video_path)[0] + "_temp_audio.wav"
-        
-        try:
-            # Use moviepy to extract audio from video
-            from moviepy.editor import VideoFileClip # type: ignore
-            
-            # Extract audio using moviepy
-            print("Extracting audio using moviepy...")
-            video_clip = VideoFileClip(video_path)
-            audio_clip = video_clip.audio
-            audio_clip.write_audiofile(temp_audio_path, logger=None)
-            audio_clip.close()
-            video_clip.close()
-            
-            # Transcribe the extracted audio using Wav2Vec2
-            audio_transcription = transcribe_audio(temp_audio_path)
-            
-            # If Wav2Vec2 transcription fails or returns an error, try using Whisper as a fallback
-            if audio_transcription.startswith("Error") or not audio_transcription.strip():
-                print("Trying alternative transcription method with Whisper...")
-                try:
-                    # Load Whisper model
-                    whisper_model = whisper.load_model("base")
-                    
-                    # Transcribe with Whisper
-                    result = whisper_model.transcribe(temp_audio_path)
-                    audio_transcription = result["text"]
-                except Exception as whisper_error:
-                    logging.error(f"Whisper transcription error: {whisper_error}")
-                    # Keep the original error message if Whisper also fails
-            
-            # Clean up the temporary audio file
-            if os.path.exists(temp_audio_path):
-                os.remove(temp_audio_path)
-                
-        except Exception as e:
-            logging.error(f"Audio extraction error: {e}")
-            audio_transcription = "Could not extract or transcribe audio from the video."
-            
-            # Clean up the temporary audio file if it exists
-            if os.path.exists(temp_audio_path):
-                os.remove(temp_audio_path)
-        
-        # Combine frame descriptions into a coherent summary
-        if not frame_descriptions:
-            return "Could not extract any meaningful content from the video."
-            
-        # Generate a summary from the frame descriptions
-        descriptions_text = "\n".join(frame_descriptions)
-        
-        # Use the existing summarization function to create a concise summary
-        print("\nFrame-by-frame descriptions:")
-        print(descriptions_text)
-        
-        print("\nGenerating final video summary...")
-        
-        # Create a summary that captures the essence of the video
-        summary = f"Video Summary ({int(duration)} seconds):\n\n"
-        
-        # Extract captions without timestamps
-        captions = [desc.split('] ')[1] for desc in frame_descriptions]
-        
-        # Group similar captions to avoid repetition
-        grouped_captions = []
-        current_group = [captions[0]]
-        
-        for i in range(1, len(captions)):
-            # Simple similarity check - if captions share significant words
-            current_words = set(current_group[-1].lower().split())
-            next_words = set(captions[i].lower().split())
-            common_words = current_words.intersection(next_words)
-            
-            # If there's significant overlap, group them
-            if len(common_words) >= 2 and len(common_words) / len(next_words) > 0.3:
-                current_group.append(captions[i])
-            else:
-                # Process the current group before starting a new one
-                if current_group:
-                    grouped_captions.append(current_group)
-                current_group = [captions[i]]
-        
-        # Add the last group
-        if current_group:
-            grouped_captions.append(current_group)
-        
-        # Generate coherent paragraphs from grouped captions
-        paragraphs = []
-        
-        # Transitional phrases to make the summary more natural
-        transitions = [
-            "The video begins with", "Initially, the video shows", "At the start,", 
-            "The scene then changes to", "Subsequently,", "Following this,", 
-            "Next, we can see", "The video continues with", "Later,", 
-            "Towards the middle,", "As the video progresses,", 
-            "The focus then shifts to", "Afterward,", 
-            "Towards the end,", "Finally,", "The video concludes with"
-        ]
-        
-        for i, group in enumerate(grouped_captions):
-            # Choose an appropriate transition based on position in the video
-            if i == 0:
-                transition = transitions[0]
-            elif i == len(grouped_captions) - 1:
-                transition = transitions[-1]
-            else:
-                # Select a middle transition based on position
-                idx = min(i + 3, len(transitions) - 3)
-                transition = transitions[idx]
-            
-            # Combine similar captions into a coherent sentence
-            if len(group) == 1:
-                paragraph = f"{transition} {group[0]}"
-            else:
-                # Extract key elements from similar captions
-                combined = group[0]
-                for caption in group[1:]:
-                    # Find unique elements in this caption
-                    current_words = set(combined.lower().split())
-                    new_words = set(caption.lower().split())
-                    unique_words = new_words - current_words
-                    
-                    if unique_words:
-                        # Add unique elements to the combined description
-                        unique_phrase = ' '.join([w for w in caption.split() if w.lower() in unique_words])
-                        combined += f" with {unique_phrase}"
-                
-                paragraph = f"{transition} {combined}"
-            
-            paragraphs.append(paragraph)
-        
-        # Combine paragraphs into a flowing narrative
-        narrative = ". ".join(paragraphs) + "."
-        
-        # Clean up any double periods or spacing issues
-        narrative = narrative.replace("..", ".").replace(" .", ".").replace(".", ". ").strip()
-        
-        summary += narrative
-        
-        # Add audio transcription to the summary if available
-        if 'audio_transcription' in locals() and audio_transcription and not audio_transcription.startswith("Error") and not audio_transcription.startswith("Could not"):
-            # Process the transcription to make it more readable
-            processed_transcription = audio_transcription.strip()
-            print("\nAudio Transcription:")
-            print(processed_transcription)
-            
-            # Add the transcription section to the summary
-            summary += "\n\nAudio Transcription:\n\n"
-            
-            # If the transcription is very long, summarize it
-            if len(processed_transcription.split()) > 200:
-                # Use the existing summarization function to create a concise summary of the transcription
-                print("Summarizing audio transcription...")
-                try:
-                    # Initialize a summarization model
-                    model_name = "facebook/bart-large-cnn"
-                    summarizer = pipeline("summarization", model=model_name, tokenizer=model_name, framework="pt", device=0 if torch.cuda.is_available() else -1)
-                    
-                    # Split text into manageable chunks and summarize each chunk
-                    text_chunks = chunk_text(processed_transcription)
-                    transcription_summaries = []
-                    
-                    for chunk in text_chunks:
-                        if len(chunk.split()) > 10:  # Only summarize if there's enough content
-                            summary_output = summarizer(chunk, max_length=100, min_length=30, do_sample=False)
-                            transcription_summaries.append(summary_output[0]['summary_text'])
-                        else:
-                            transcription_summaries.append(chunk)
-                    
-                    # Combine summaries
-                    processed_transcription = " ".join(transcription_summaries)
-                except Exception as e:
-                    logging.error(f"Transcription summarization error: {e}")
-                    # If summarization fails, use the original transcription
-                    pass
-            
-            summary += processed_transcription
-            
-            # Create a combined summary section that integrates visual and audio information
-            summary += "\n\nIntegrated Summary:\n\n"
-            
-            # Create a more coherent narrative by combining visual and audio information
-            try:
-                # Initialize a summarization model for the final integration
-                model_name = "facebook/bart-large-cnn"
-                integrator = pipeline("summarization", model=model_name, tokenizer=model_name, framework="pt", device=0 if torch.cuda.is_available() else -1)
-                
-                # Combine visual narrative and processed transcription
-                combined_text = f"Visual content: {narrative} Audio content: {processed_transcription}"
-                
-                # Generate an integrated summary
-                integrated_summary = integrator(combined_text, max_length=150, min_length=50, do_sample=False)
-                summary += integrated_summary[0]['summary_text']
-            except Exception as e:
-                logging.error(f"Integration summarization error: {e}")
-                # If integration fails, provide a simple combined summary
-                summary += "This video contains visual elements showing " + narrative.lower() + " The audio discusses " + processed_transcription[:100] + "..."
-        
-        return summary
-        
-    except Exception as e:
-        logging.error(f"Video summarization error: {e}")
-        return f"Error during video summarization: {str(e)}"
-    
-def answer_question(text, ask):
-    """
-    Answer questions based on the given text using a pre-trained QA model.
-    
-    :param text: The original document content.
-    :param question: The question asked by the user.
-    :return: Answer extracted from the text.
-    """
-    try:
-        qa_model = pipeline("question-answering", model="distilbert-base-cased-distilled-squad")
-        result = qa_model(question=ask, context=text)
-        return result["answer"]
-    except Exception as e:
-        return f"Error processing question: {str(e)}"
-
-
-# Output Functions
-def save_as_txt(text, filename="summary_output.txt"):
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(text)
-
-def save_as_json(data, filename="summary_output.json"):
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
-
-def save_as_pdf(text, filename="summary_output.pdf"):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    pdf.multi_cell(0, 10, text)
-    pdf.output(filename)
-
-def save_as_docx(text, filename="summary_output.docx"):
-    doc = Document()
-    doc.add_paragraph(text)
-    doc.save(filename)
-
-# Main Application
-def main():
-    print("Welcome to the Advanced Text Summarizer!")
-    print("Choose a summarization model (t5-small/bart-large/distilbart/pegasus/t5-3b):")
-    model_choice = input("Model: ")
-    user_input = ""
-
-    while True:
-        print("\nOptions: text, file, pdf, image, audio, video, exit")
-        choice = input("Enter your choice: ").lower()
-
-        if choice == 'exit':
-            print("Exiting. Goodbye!")
-            break
-
-        elif choice == 'text':
-            user_input = input("Enter text: ")
-        
-        elif choice == 'file':
-            filename = input("Enter filename (.txt): ")
-            with open(filename, "r", encoding="utf-8") as f:
-                user_input = f.read()
-
-        elif choice == 'pdf':
-            filename = input("Enter PDF filename: ")
-            user_input = read_pdf(filename)
-
-        elif choice == 'image':
-            filename = input("Enter image filename: ")
-            user_input = extract_text_from_image(filename)
-            if "Error" in user_input:
-                print(user_input)
-                continue
-
-
-        elif choice == 'audio':
-            filename = input("Enter audio filename: ")
-            user_input = transcribe_audio(filename)
-            
-        elif choice == 'video':
-            filename = input("Enter video filename: ")
-            user_input = summarize_video(filename)
-            if "Error" in user_input:
-                print(user_input)
-                continue
-        
-        else:
-            print("Invalid choice.")
-            continue
-
-        if not user_input.strip():
-            print("Empty input! Try again.")
-            continue
-
-        language = detect(user_input)
-        if language != "en":
-            print(f"Detected language: {language}, translating to English...")
-            user_input = GoogleTranslator(source=language, target="en").translate(user_input)
-
-
-        processed_text = preprocess_text(user_input)
-        summary = summarize_text(processed_text, model_choice)
-
-
-        print("\nSummary:")
-        print(summary)
-
-        save_format = input("Save as (txt/json/pdf/docx): ").lower()
-        if save_format == 'txt':
-            save_as_txt(summary)
-        elif save_format == 'json':
-            save_as_json({"summary": summary})
-        elif save_format == 'pdf':
-            save_as_pdf(summary)
-        elif save_format == 'docx':
-            save_as_docx(summary)
-        else:
-            print("Invalid save format.")
-        
-        while True:
-            ask_choice = input("Do you want to ask a question about the text? (yes/no): ").lower()
-            if ask_choice == 'yes':
-                ask = input("Enter your question: ")
-                answer = answer_question(user_input, ask)
-                print("\nAnswer:\n", answer)
-            elif ask_choice == 'no':
-                break
-            else:
-                print("Invalid input! Please type 'yes' or 'no'.")
-
-if __name__ == "__main__":
-    main()
->>>>>>> 332449a7ae3ed30e52c34f172658560db2ded9b0